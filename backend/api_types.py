@@ -1,8 +1,9 @@
-from pydantic import BaseModel, EmailStr, ConfigDict, model_validator, computed_field, Field
+from pydantic import BaseModel, EmailStr, ConfigDict, model_validator, field_validator, computed_field, Field
 from typing import Optional, List
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from uuid import UUID
 from decimal import Decimal
+from enum import Enum
 from models import ProjectStatus, InvoiceStatus
 
 # ============================================
@@ -117,6 +118,19 @@ class ProjectWithClient(ProjectResponse):
     """Project response with client details included"""
     client: Optional[ClientResponse] = None
 
+class ProjectBudget(BaseModel):
+    """Budget consumption for a project (hours from completed time entries)"""
+    budget_hours: Optional[Decimal] = None
+    hours_used: Decimal
+    hours_remaining: Optional[Decimal] = None
+    percent_used: Optional[Decimal] = None
+    burn_rate_hours_per_day: Decimal
+    projected_overrun_date: Optional[date] = None
+
+class ProjectWithBudget(ProjectWithClient):
+    """Project response with client details and budget consumption"""
+    budget: Optional[ProjectBudget] = None
+
 # ============================================
 # TIME ENTRIES
 # ============================================
@@ -140,7 +154,7 @@ class TimeEntryManual(BaseModel):
     project_id: UUID
     description: Optional[str] = None
     start_time: datetime
-    duration_seconds: int  
+    duration_seconds: int = Field(ge=0)
     is_billable: bool = True
 
 class TimeEntryUpdate(BaseModel):
@@ -149,7 +163,7 @@ class TimeEntryUpdate(BaseModel):
     description: Optional[str] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
-    duration_seconds: Optional[int] = None
+    duration_seconds: Optional[int] = Field(default=None, ge=0)
     is_billable: Optional[bool] = None
     
     @model_validator(mode='after')
@@ -196,11 +210,134 @@ class TimeEntryWithProject(TimeEntryResponse):
     
     model_config = ConfigDict(from_attributes=True)
 
+class TimeEntryImportRow(BaseModel):
+    """
+    One row of a bulk time entry import (CSV column / NDJSON key names)
+    
+    The project is given either by id or by name, and the end either as
+    end_time or as duration_seconds
+    """
+    project_id: Optional[UUID] = None
+    project: Optional[str] = None
+    description: Optional[str] = None
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    duration_seconds: Optional[int] = Field(default=None, ge=0)
+    is_billable: bool = True
+    
+    @field_validator('start_time', 'end_time')
+    @classmethod
+    def assume_utc(cls, value):
+        # Files mix offset-less and offset times; offset-less ones are UTC
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+    
+    @model_validator(mode='after')
+    def check_row(self):
+        if not self.project_id and not self.project:
+            raise ValueError('Either project_id or project is required')
+        if self.end_time is None and self.duration_seconds is None:
+            raise ValueError('Either end_time or duration_seconds is required')
+        if self.end_time and self.start_time >= self.end_time:
+            raise ValueError('End time must be after start time')
+        return self
+
+class TimeEntryImportError(BaseModel):
+    """A row that could not be imported (row is the line number in the file)"""
+    row: int
+    error: str
+
+class TimeEntryImportResult(BaseModel):
+    """Response body for a bulk time entry import"""
+    imported: int
+    failed: int
+    errors: List[TimeEntryImportError] = Field(default_factory=list)
+    errors_truncated: bool = False
+
+class TimeEntryFilter(BaseModel):
+    """Same filters as the time entry list endpoint"""
+    project_id: Optional[UUID] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    is_billable: Optional[bool] = None
+    is_invoiced: Optional[bool] = None
+
+class TimeEntryBulkDelete(BaseModel):
+    """Request body for bulk deleting time entries, by ids or by filters"""
+    ids: Optional[List[UUID]] = None
+    filters: Optional[TimeEntryFilter] = None
+    
+    @model_validator(mode='after')
+    def check_selection(self):
+        if (self.ids is None) == (self.filters is None):
+            raise ValueError('Provide exactly one of ids or filters')
+        return self
+
+class TimeEntryBulkUpdate(TimeEntryBulkDelete):
+    """Request body for bulk updating time entries (fields to change are optional)"""
+    project_id: Optional[UUID] = None
+    description: Optional[str] = None
+    is_billable: Optional[bool] = None
+
+    @model_validator(mode='after')
+    def check_not_null(self):
+        # Omitted means unchanged; only description may be cleared with null
+        for field in ('project_id', 'is_billable'):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f'{field} cannot be null')
+        return self
+
+class TimeEntryBulkSkipped(BaseModel):
+    """A time entry left untouched by a bulk operation"""
+    id: UUID
+    reason: str
+
+class TimeEntryBulkResult(BaseModel):
+    """Response body for bulk update/delete"""
+    affected: int
+    skipped: List[TimeEntryBulkSkipped] = Field(default_factory=list)
+
+class TimeSummaryGroupBy(str, Enum):
+    """Bucketing options for the time summary"""
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    PROJECT = "project"
+    CLIENT = "client"
+
+class TimeSummaryBucket(BaseModel):
+    """Aggregated time for one bucket (a period, project or client)"""
+    key: Optional[str] = None
+    label: str
+    entry_count: int
+    total_seconds: int
+    billable_seconds: int
+    unbilled_seconds: int
+    billable_amount: Decimal
+
+class TimeSummaryResponse(BaseModel):
+    """Response body for the time summary"""
+    group_by: TimeSummaryGroupBy
+    buckets: List[TimeSummaryBucket] = Field(default_factory=list)
+    totals: TimeSummaryBucket
+
+class TimeEntryOverlap(BaseModel):
+    """Two time entries whose time ranges overlap"""
+    first: TimeEntryResponse
+    second: TimeEntryResponse
+    overlap_seconds: int
+
 class TimerStartRequest(BaseModel):
     """Request to start a timer"""
     project_id: UUID
     description: Optional[str] = None
 
+class TimerStreamToken(BaseModel):
+    """Short-lived token for opening the timer stream (?token=...)"""
+    token: str
+    expires_in: int
+
 class TimerResponse(BaseModel):
     """Response for running timer"""
     id: UUID
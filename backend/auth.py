@@ -1,24 +1,44 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Optional, cast
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import threading
+import time
 import uuid
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models import User
-from db import get_session
+from db import get_async_session
 
 # Config
 from config import *
 
-# Password hashing setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing setup (hashes outside the configured cost count as
+# deprecated, so verify_and_update() rehashes them)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 
 # HTTP Bearer token scheme for FastAPI
 security = HTTPBearer()
 
+# Seconds a verified token / loaded user is reused without re-checking
+AUTH_CACHE_TTL = 60
+
+# Max tokens and users kept (least recently used are evicted first)
+AUTH_CACHE_SIZE = 10_000
+
+# `scope` claim of timer stream tokens; access tokens have none
+STREAM_TOKEN_SCOPE = "timer-stream"
+
 def hash_password(password:str) -> str:
     """Hashing the users password before storing it in the db"""
     return pwd_context.hash(password)
@@ -55,45 +75,132 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     
     return encoded_jwt
 
+def create_stream_token(user_id: uuid.UUID) -> str:
+    """Short-lived token that only opens the user's timer stream"""
+    return create_access_token(
+        {"sub": str(user_id), "scope": STREAM_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS)
+    )
+
 # ============================================
 # DEPENDENCY: GET CURRENT USER
 # ============================================
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session)
-) -> User:
+# token -> (expires_at, user_id), user_id -> (expires_at, User); monotonic times
+_token_cache: "OrderedDict[str, tuple[float, uuid.UUID]]" = OrderedDict()
+_user_cache: "OrderedDict[uuid.UUID, tuple[float, User]]" = OrderedDict()
+_auth_cache_lock = threading.Lock()
+
+
+def _cache_get(cache: OrderedDict, key):
+    with _auth_cache_lock:
+        cached = cache.get(key)
+        if not cached:
+            return None
+        if cached[0] <= time.monotonic():
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return cached[1]
+
+
+def _cache_put(cache: OrderedDict, key, value, ttl: float) -> None:
+    with _auth_cache_lock:
+        cache[key] = (time.monotonic() + ttl, value)
+        cache.move_to_end(key)
+        while len(cache) > AUTH_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def invalidate_cached_user(user_id: uuid.UUID) -> None:
+    """Drop a user's cached row after it changes (tokens stay valid until they expire)"""
+    with _auth_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+def decode_user_id(token: str, scope: Optional[str] = None) -> Optional[uuid.UUID]:
     """
-    Dependency to get the current authenticated user from JWT token
+    User id from a valid token of the given scope (None: an access token)
+    
+    Access tokens are cached, so their signature is only verified on cache misses
     """
+    if scope is None:
+        user_id = _cache_get(_token_cache, token)
+        if user_id:
+            return user_id
+    
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]) # type: ignore
+        subject: str | None = payload.get("sub")
+        if subject is None or payload.get("scope") != scope:
+            return None
+        user_id = uuid.UUID(subject)
+    except (JWTError, ValueError):
+        return None
+    
+    # Never trust a cached token past its own expiry
+    ttl = AUTH_CACHE_TTL
+    if payload.get("exp"):
+        ttl = min(ttl, payload["exp"] - time.time())
+    if scope is None and ttl > 0:
+        _cache_put(_token_cache, token, user_id, ttl)
+    return user_id
+
+
+async def load_user(session: AsyncSession, user_id: Optional[uuid.UUID]) -> User:
+    """The user a decoded token belongs to, from the cache or the database"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        # Extract token from Authorization header
-        token = credentials.credentials
-        
-        # Decode JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]) # type: ignore
-        user_id: str | None = payload.get("sub")
-        
-        if user_id is None:
-            raise credentials_exception
-            
-    except JWTError:
+    if user_id is None:
         raise credentials_exception
     
+    # Steady state: no database round trip
+    user = _cache_get(_user_cache, user_id)
+    if user:
+        return user
+    
     # Get user from database
-    user = session.get(User, uuid.UUID(user_id))
+    user = await session.get(User, user_id)
     
     if user is None:
         raise credentials_exception
     
+    # Detach, so a commit or rollback in the route never expires it (async
+    # sessions can't lazily reload attributes) and it can be shared by the cache
+    session.expunge(user)
+    _cache_put(_user_cache, user_id, user, AUTH_CACHE_TTL)
+    
     return user
 
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
+    """
+    Dependency to get the current authenticated user from JWT token
+    """
+    # Extract and verify token from Authorization header
+    return await load_user(session, decode_user_id(credentials.credentials))
+
+
+async def get_stream_user(
+    token: str = Query(..., description="Token from POST /time-entries/timer/stream-token"),
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
+    """
+    Dependency for the timer stream: the user of a stream token in the query
+    
+    EventSource can't set an Authorization header, so the token travels in
+    the URL. Only short-lived stream tokens are accepted there, never access
+    tokens, which would otherwise end up in access logs.
+    """
+    return await load_user(session, decode_user_id(token, STREAM_TOKEN_SCOPE))
+
 # OAuth create/get
 def get_or_create_oauth_user(
     session: Session,
@@ -141,6 +248,7 @@ def get_or_create_oauth_user(
         session.add(user)
         session.commit()
         session.refresh(user)
+        invalidate_cached_user(user.id)
         return user
     
     # Create new user
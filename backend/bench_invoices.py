@@ -0,0 +1,161 @@
+"""
+Benchmark of invoice generation by invoice size
+
+Boots `main:app` (the working tree, or another commit with --ref), imports
+`size` billable entries for one project, then times POST /invoices/generate
+over all of them. Each size is run --repeat times on fresh entries; the
+median wall time and the statements the request ran (from the query
+profiler's Server-Timing header) are reported.
+
+    python bench_invoices.py --sizes 10,100,1000,2000 --output invoices.json
+    python bench_invoices.py --ref 61f8bca^ --output invoices-before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+
+from loadtest import (
+    BACKEND_DIR, PASSWORD, add_worktree, git_commit, remove_worktree, start_server, stop_server, wait_for_server
+)
+
+
+def query_count(response: httpx.Response) -> int:
+    match = re.search(r'desc="(\d+) queries"', response.headers.get("Server-Timing", ""))
+    return int(match.group(1)) if match else -1
+
+
+class Bench:
+    """One account with a single client and project"""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.headers: dict[str, str] = {}
+        self.client_id = ""
+        self.project_id = ""
+        # Entries are laid end to end so they never overlap
+        self.next_start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    async def setup(self) -> None:
+        response = await self.client.post("/auth/register", json={
+            "email": f"bench-{uuid.uuid4().hex[:8]}@example.com",
+            "first_name": "Bench", "last_name": "Invoices", "password": PASSWORD,
+        })
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        response = await self.client.post("/clients/", json={"name": "Acme"}, headers=self.headers)
+        response.raise_for_status()
+        self.client_id = response.json()["id"]
+        response = await self.client.post("/projects/", json={
+            "name": "Website", "client_id": self.client_id, "hourly_rate": "125"
+        }, headers=self.headers)
+        response.raise_for_status()
+        self.project_id = response.json()["id"]
+
+    async def add_entries(self, count: int) -> list[str]:
+        """Import `count` entries and return the ids of every uninvoiced one"""
+        lines = []
+        for _ in range(count):
+            lines.append(json.dumps({
+                "project_id": self.project_id,
+                "description": "Benchmark entry",
+                "start_time": self.next_start.isoformat(),
+                "duration_seconds": 1800,
+            }))
+            self.next_start += timedelta(hours=1)
+        response = await self.client.post(
+            "/time-entries/import", params={"format": "ndjson"}, headers=self.headers,
+            files={"file": ("entries.ndjson", "\n".join(lines).encode())}
+        )
+        response.raise_for_status()
+        assert response.json()["imported"] == count, response.text
+
+        ids: list[str] = []
+        params: dict = {"is_invoiced": "false", "limit": 500}
+        while True:
+            response = await self.client.get("/time-entries/", params=params, headers=self.headers)
+            response.raise_for_status()
+            ids.extend(entry["id"] for entry in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return ids
+            params = {"is_invoiced": "false", "limit": 500, "cursor": cursor}
+
+    async def generate(self, entry_ids: list[str]) -> tuple[float, int]:
+        start = time.perf_counter()
+        response = await self.client.post("/invoices/generate", json={
+            "client_id": self.client_id,
+            "time_entry_ids": entry_ids,
+            "issue_date": date.today().isoformat(),
+            "due_date": (date.today() + timedelta(days=30)).isoformat(),
+        }, headers=self.headers)
+        seconds = time.perf_counter() - start
+        response.raise_for_status()
+        assert len(response.json()["line_items"]) == len(entry_ids)
+        return seconds, query_count(response)
+
+
+async def run(args) -> dict:
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-invoices-'), 'bench.db')}"
+    worktree = add_worktree(args.ref) if args.ref else None
+    server = start_server(database_url, args.port, 1, worktree or BACKEND_DIR)
+    results = []
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=300) as client:
+            await wait_for_server(client, server)
+            bench = Bench(client)
+            await bench.setup()
+            for size in args.sizes:
+                timings, queries = [], []
+                for _ in range(args.repeat):
+                    entry_ids = await bench.add_entries(size)
+                    seconds, count = await bench.generate(entry_ids)
+                    timings.append(seconds)
+                    queries.append(count)
+                results.append({
+                    "entries": size,
+                    "median_ms": round(statistics.median(timings) * 1000, 1),
+                    "min_ms": round(min(timings) * 1000, 1),
+                    "queries": max(queries),
+                })
+                print(f"  {size:>6} entries  {results[-1]['median_ms']:>9.1f} ms  {results[-1]['queries']:>6} queries")
+    finally:
+        stop_server(server)
+        if worktree is not None:
+            remove_worktree(worktree)
+
+    return {
+        "commit": git_commit(args.ref or "HEAD"),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ref", help="Boot the server from this git commit instead of the working tree")
+    parser.add_argument("--sizes", default="10,100,1000,2000", help="Comma-separated entries per invoice")
+    parser.add_argument("--repeat", type=int, default=3, help="Invoices per size (the median is reported)")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--output", default="bench_invoices.json", help="JSON results file")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+
+    print(f"📄 Generating invoices on {args.ref or 'the working tree'}...")
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✨ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import math
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import case, event, func
+from sqlmodel import Session, select
+
+from models import DailyRollup, Project
+from api_types import ProjectBudget
+
+# Days of recent work used to project when the budget runs out
+BURN_WINDOW_DAYS = 28
+
+# Upper bound on staleness (e.g. writes made by another worker process)
+CONSUMPTION_CACHE_TTL = 300
+
+
+class ProjectConsumption(BaseModel):
+    """Time logged against a project, from the daily rollups"""
+    total_seconds: int
+    recent_seconds: int
+
+
+# ============================================
+# CONSUMPTION CACHE
+# ============================================
+
+_cache: dict[UUID, tuple[float, ProjectConsumption]] = {}
+_cache_lock = threading.Lock()
+
+
+def invalidate_project_consumption(project_ids: Iterable[UUID]) -> None:
+    """Drop cached consumption for projects whose time entries changed"""
+    with _cache_lock:
+        for project_id in project_ids:
+            _cache.pop(project_id, None)
+
+
+def mark_projects_changed(session: Session, project_ids: Iterable[UUID], user_ids: Iterable[UUID]) -> None:
+    """
+    Invalidate now and again once the session commits, so a read racing the
+    open transaction can't leave pre-commit totals in the cache
+    """
+    project_ids, user_ids = set(project_ids), set(user_ids)
+    invalidate_project_consumption(project_ids)
+    bump_budget_versions(user_ids)
+    session.info.setdefault("changed_project_ids", set()).update(project_ids)
+    session.info.setdefault("changed_budget_user_ids", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    invalidate_project_consumption(session.info.pop("changed_project_ids", ()))
+    bump_budget_versions(session.info.pop("changed_budget_user_ids", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("changed_project_ids", None)
+    session.info.pop("changed_budget_user_ids", None)
+
+
+def invalidate_all_project_consumption() -> None:
+    global _generation
+    with _cache_lock:
+        _cache.clear()
+        _generation += 1
+
+
+# ============================================
+# BUDGET VERSIONS (for ETags)
+# ============================================
+#
+# Counted per user in this process as consumption is invalidated. The
+# process token keeps two workers' counters from ever producing the same
+# tag, and the TTL period bounds staleness from other workers' writes the
+# same way the cache does.
+
+_process_token = uuid.uuid4().hex
+_generation = 0
+_versions: dict[UUID, int] = {}
+
+
+def bump_budget_versions(user_ids: Iterable[UUID]) -> None:
+    with _cache_lock:
+        for user_id in user_ids:
+            _versions[user_id] = _versions.get(user_id, 0) + 1
+
+
+def budget_version(user_id: UUID) -> str:
+    """Changes whenever the user's budget consumption may have changed"""
+    period = int(time.time() // CONSUMPTION_CACHE_TTL)
+    with _cache_lock:
+        return f"{_process_token}.{_generation}.{_versions.get(user_id, 0)}.{period}"
+
+
+def get_project_consumption(session: Session, project_ids: list[UUID]) -> dict[UUID, ProjectConsumption]:
+    """
+    Consumption for each project, computing cache misses with one aggregate query
+    """
+    now = time.monotonic()
+    result: dict[UUID, ProjectConsumption] = {}
+    with _cache_lock:
+        for project_id in project_ids:
+            cached = _cache.get(project_id)
+            if cached and now - cached[0] < CONSUMPTION_CACHE_TTL:
+                result[project_id] = cached[1]
+
+    missing = [project_id for project_id in project_ids if project_id not in result]
+    if not missing:
+        return result
+
+    window_start = date.today() - timedelta(days=BURN_WINDOW_DAYS)
+    statement = (
+        select(
+            DailyRollup.project_id,
+            func.sum(DailyRollup.total_seconds),
+            func.sum(case((DailyRollup.day >= window_start, DailyRollup.total_seconds), else_=0)),
+        )
+        .where(DailyRollup.project_id.in_(missing))  # type: ignore
+        .group_by(DailyRollup.project_id)
+    )
+    rows = {project_id: (total, recent) for project_id, total, recent in session.exec(statement).all()}
+
+    with _cache_lock:
+        for project_id in missing:
+            total, recent = rows.get(project_id, (0, 0))
+            consumption = ProjectConsumption(total_seconds=int(total or 0), recent_seconds=int(recent or 0))
+            _cache[project_id] = (now, consumption)
+            result[project_id] = consumption
+
+    return result
+
+
+# ============================================
+# BUDGET REPORT
+# ============================================
+
+def build_budget(project: Project, consumption: Optional[ProjectConsumption]) -> ProjectBudget:
+    """Budget usage and projected overrun date for a project"""
+    consumption = consumption or ProjectConsumption(total_seconds=0, recent_seconds=0)
+    hours_used = (Decimal(consumption.total_seconds) / Decimal("3600")).quantize(Decimal("0.01"))
+    burn_rate = (Decimal(consumption.recent_seconds) / Decimal("3600") / BURN_WINDOW_DAYS).quantize(Decimal("0.01"))
+
+    budget = ProjectBudget(
+        budget_hours=project.budget_hours,
+        hours_used=hours_used,
+        burn_rate_hours_per_day=burn_rate
+    )
+
+    if project.budget_hours:
+        remaining = project.budget_hours - hours_used
+        budget.hours_remaining = remaining
+        budget.percent_used = (hours_used / project.budget_hours * 100).quantize(Decimal("0.01"))
+
+        if remaining <= 0:
+            budget.projected_overrun_date = date.today()
+        elif consumption.recent_seconds:
+            # Exact ratio, not the rounded display rate
+            days_left = remaining * 3600 * BURN_WINDOW_DAYS / consumption.recent_seconds
+            budget.projected_overrun_date = date.today() + timedelta(days=math.ceil(days_left))
+
+    return budget
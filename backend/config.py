@@ -17,6 +17,31 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
 
+# Optional: defaults to DATABASE_URL with its asyncio driver (asyncpg / aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Connection pool, per engine and per worker process: size it so
+# workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under the server's max_connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))      # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))    # seconds before a connection is replaced
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+# SQLite only (development, tests, load-test stand-in): milliseconds a
+# connection waits for another's write lock before "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 30000))
+
+# Statements slower than this are logged (timetracker.sql logger)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+# Slowest statements kept per request for the request log line
+QUERY_PROFILER_TOP = int(os.getenv("QUERY_PROFILER_TOP", 5))
+
+# N+1 query detector for development and tests: off | warn (log) | strict (raise)
+N_PLUS_ONE_MODE = os.getenv("N_PLUS_ONE_MODE", "off").lower()
+# Executions of one query shape within a request that count as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
 # ============================================
 # JWT CONFIGURATION
 # ============================================
@@ -28,6 +53,31 @@ if not SECRET_KEY:
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 10080))
 
+# Lifetime of the tokens EventSource passes in the timer stream URL (it
+# can't send headers); they only need to outlive opening the connection
+STREAM_TOKEN_EXPIRE_SECONDS = int(os.getenv("STREAM_TOKEN_EXPIRE_SECONDS", 60))
+
+# ============================================
+# PASSWORD HASHING CONFIGURATION
+# ============================================
+
+# bcrypt cost; stored hashes with another cost are rehashed on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# Threads dedicated to hashing, and how many requests may wait for one
+# before new ones are turned away with a 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 32))
+
+# ============================================
+# INVOICE CONFIGURATION
+# ============================================
+
+# Invoice numbers count per user; the format gets {prefix} and {number}
+# (the user's nth invoice), e.g. "{prefix}{number:03d}" -> INV-001
+INVOICE_NUMBER_PREFIX = os.getenv("INVOICE_NUMBER_PREFIX", "INV-")
+INVOICE_NUMBER_FORMAT = os.getenv("INVOICE_NUMBER_FORMAT", "{prefix}{number:03d}")
+
 # ============================================
 # OAUTH CONFIGURATION
 # ============================================
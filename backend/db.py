@@ -1,15 +1,208 @@
-from sqlmodel import SQLModel, Session, create_engine
-from config import DATABASE_URL
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event, func, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from config import (
+    DATABASE_URL, ASYNC_DATABASE_URL, DB_ECHO,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    SQLITE_BUSY_TIMEOUT_MS
+)
+from pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_pool
+from query_profiler import instrument_engine
+import n_plus_one
 
-engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True) # type: ignore
+POOL_SETTINGS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+)
+
+
+def configure_sqlite(engine) -> None:
+    """
+    WAL journal and a busy timeout on every SQLite connection (no-op otherwise)
+
+    Readers no longer block the writer, and a writer waits for the lock
+    instead of failing with "database is locked" under concurrent requests
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+
+engine = create_engine(DATABASE_URL, echo=DB_ECHO, poolclass=InstrumentedQueuePool, **POOL_SETTINGS) # type: ignore
+configure_sqlite(engine)
+instrument_pool("sync", engine)
+instrument_engine(engine)
+n_plus_one.instrument_engine(engine)
+
+# Async drivers for the sync URLs we accept
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Same database as `url`, through its asyncio driver"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL or async_database_url(DATABASE_URL),  # type: ignore
+    echo=DB_ECHO,
+    poolclass=InstrumentedAsyncQueuePool,
+    **POOL_SETTINGS
+)
+configure_sqlite(async_engine.sync_engine)
+instrument_pool("async", async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine)
+n_plus_one.instrument_engine(async_engine.sync_engine)
+
+# Objects stay readable after commit; attributes the server sets on
+# update (updated_at) still need an explicit refresh
+async_session_maker = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 # Debugging statements
 # print("Engine created: ", engine)
 # print("Engine URL: ", engine.url)
 
+# Indexes a model no longer declares, dropped from existing databases
+OBSOLETE_INDEXES = [
+    "ix_invoice_invoice_number",  # invoice numbers were globally unique, now per user
+]
+
+# Columns once created as timestamp without time zone (holding UTC), which
+# must be timestamptz before the range index on them can be built
+TIMESTAMPTZ_COLUMNS = [
+    ("timeentry", "start_time"),
+    ("timeentry", "end_time"),
+]
+
+def migrate_timestamptz_columns(connection) -> None:
+    """Convert TIMESTAMPTZ_COLUMNS still typed timestamp (Postgres; rewrites the table once)"""
+    if connection.dialect.name != "postgresql":
+        return
+    for table_name, column_name in TIMESTAMPTZ_COLUMNS:
+        data_type = connection.execute(
+            text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+            ),
+            {"table": table_name, "column": column_name}
+        ).scalar()
+        if data_type == "timestamp without time zone":
+            connection.execute(text(
+                f'ALTER TABLE "{table_name}" ALTER COLUMN "{column_name}" '
+                f"TYPE timestamptz USING \"{column_name}\" AT TIME ZONE 'UTC'"
+            ))
+
+def repair_inverted_entries() -> None:
+    """
+    Collapse entries that end before they start to zero length
+
+    Negative manual durations were once accepted; Postgres can't build the
+    range index over such rows, and they count negative time. The users'
+    rollups are rebuilt afterwards.
+    """
+    from models import TimeEntry
+    from rollups import rebuild_rollups
+
+    inverted = TimeEntry.end_time < TimeEntry.start_time
+    with Session(engine) as session:
+        user_ids = session.exec(select(TimeEntry.user_id).where(inverted).distinct()).all()
+        if not user_ids:
+            return
+        session.exec(update(TimeEntry).where(inverted).values(  # type: ignore
+            end_time=TimeEntry.start_time, duration_seconds=0
+        ))
+        session.commit()
+        for user_id in user_ids:
+            rebuild_rollups(session, user_id)
+
+def stop_duplicate_running_timers() -> None:
+    """
+    Stop all but the latest running timer of each user
+
+    Concurrent starts could once leave a user with several, which the unique
+    running-timer index rejects. Each extra one is stopped where the next
+    one started, so they don't overlap; the users' rollups are rebuilt
+    afterwards.
+    """
+    from models import TimeEntry
+    from rollups import rebuild_rollups
+
+    running = (TimeEntry.end_time == None) & (TimeEntry.is_active == True)
+    with Session(engine) as session:
+        user_ids = session.exec(
+            select(TimeEntry.user_id).where(running).group_by(TimeEntry.user_id).having(func.count() > 1)
+        ).all()
+        if not user_ids:
+            return
+        timers = session.exec(
+            select(TimeEntry)
+            .where(running, TimeEntry.user_id.in_(user_ids))  # type: ignore
+            .order_by(TimeEntry.user_id, TimeEntry.start_time)  # type: ignore
+        ).all()
+        for timer, following in zip(timers, timers[1:]):
+            if following.user_id == timer.user_id:
+                timer.end_time = following.start_time
+                timer.duration_seconds = int((following.start_time - timer.start_time).total_seconds())
+        session.commit()
+        for user_id in user_ids:
+            rebuild_rollups(session, user_id)
+
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
     
+    with engine.begin() as connection:
+        migrate_timestamptz_columns(connection)
+    
+    # Rows the new indexes would reject
+    repair_inverted_entries()
+    stop_duplicate_running_timers()
+    
+    # create_all() skips tables that already exist, so indexes added to a
+    # model later would never reach an existing database
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    
+    with engine.begin() as connection:
+        for name in OBSOLETE_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    
+# Dialects whose INSERT supports ON CONFLICT (upserts)
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def dialect_insert(session, table):
+    """INSERT into `table` for the session's database, with on_conflict_do_update/_nothing"""
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name not in DIALECT_INSERTS:
+        raise NotImplementedError(f"Upserts are not supported on {dialect_name}")
+    return DIALECT_INSERTS[dialect_name](table)
+
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    """Session for `async def` routes: queries never hold a threadpool worker"""
+    async with async_session_maker() as session:
+        yield session
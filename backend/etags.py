@@ -0,0 +1,69 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+# Lets the browser keep responses but always revalidate them with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+# ============================================
+# ETAG COMPUTATION
+# ============================================
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the given version parts"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def collection_etag(session: Session, sources: list[tuple[Any, list]], *extra: Any) -> str:
+    """
+    ETag for a list response, without loading any rows
+
+    Each source is (model, conditions); its version is max(updated_at) and
+    count(*) over the matching rows. All sources are read in a single query.
+    `extra` should carry the request's query params so different filters or
+    pages get different tags.
+    """
+    columns = []
+    for model, conditions in sources:
+        columns.append(select(func.max(model.updated_at)).where(*conditions).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).where(*conditions).scalar_subquery())
+    versions = session.exec(select(*columns)).one()  # type: ignore
+    return make_etag(*versions, *extra)
+
+
+# ============================================
+# CONDITIONAL REQUESTS
+# ============================================
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Tag the response, and return a 304 to send instead if the client is current
+
+    Usage in a handler:
+        cached = not_modified(request, response, etag)
+        if cached:
+            return cached
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    return None
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager
+from uuid import UUID
+
+# Events buffered per open stream before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+# ============================================
+# BROKER INTERFACE
+# ============================================
+
+class TimerEventBroker(ABC):
+    """
+    Delivers timer events to every open stream of a user
+
+    Routers publish from sync handlers (threadpool), streams consume on the
+    event loop. Replace the local broker with set_broker() to fan events out
+    across processes (e.g. Redis pub/sub or Postgres LISTEN/NOTIFY).
+    """
+
+    @abstractmethod
+    def publish(self, user_id: UUID, event: dict) -> None:
+        """Deliver `event` to the user's streams (thread-safe, non-blocking)"""
+
+    @abstractmethod
+    def subscribe(self, user_id: UUID) -> "AsyncContextManager[asyncio.Queue]":
+        """Async context manager yielding a queue of the user's events"""
+
+
+# ============================================
+# LOCAL (IN-PROCESS) BROKER
+# ============================================
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    """Enqueue without blocking, dropping the oldest event for slow consumers"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class LocalTimerEventBroker(TimerEventBroker):
+    """Single-process broker: only streams served by this worker are notified"""
+
+    def __init__(self):
+        self._subscribers: dict[UUID, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, user_id: UUID, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, event)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: UUID):  # type: ignore[override]
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers[user_id].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(subscriber)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+
+
+_broker: TimerEventBroker = LocalTimerEventBroker()
+
+
+def get_broker() -> TimerEventBroker:
+    return _broker
+
+
+def set_broker(broker: TimerEventBroker) -> None:
+    """Swap the broker (call at startup, before any stream is opened)"""
+    global _broker
+    _broker = broker
+
+
+def publish_timer_event(user_id: UUID, event_type: str, data: dict) -> None:
+    """Notify the user's open timer streams"""
+    _broker.publish(user_id, {"type": event_type, "data": data})
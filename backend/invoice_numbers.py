@@ -0,0 +1,54 @@
+from uuid import UUID
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from config import INVOICE_NUMBER_PREFIX, INVOICE_NUMBER_FORMAT
+from db import dialect_insert
+from models import Invoice, InvoiceCounter
+
+
+def format_invoice_number(number: int) -> str:
+    """Display form of a user's nth invoice, e.g. INV-001"""
+    return INVOICE_NUMBER_FORMAT.format(prefix=INVOICE_NUMBER_PREFIX, number=number)
+
+
+def next_invoice_number(session: Session, user_id: UUID) -> str:
+    """
+    Claim the user's next invoice number in the caller's transaction
+
+    One UPDATE ... RETURNING on the user's counter row. The row lock it takes
+    holds off concurrent generations for the same user until commit, and a
+    rollback hands the number back, so numbers have no gaps or duplicates.
+    """
+    statement = (
+        update(InvoiceCounter)
+        .where(InvoiceCounter.user_id == user_id)  # type: ignore
+        .values(last_number=InvoiceCounter.last_number + 1)
+        .returning(InvoiceCounter.last_number)
+        .execution_options(synchronize_session=False)
+    )
+    number = session.execute(statement).scalar_one_or_none()
+    if number is None:
+        number = _create_counter(session, user_id)
+    return format_invoice_number(number)
+
+
+def _create_counter(session: Session, user_id: UUID) -> int:
+    """
+    First number for a user without a counter row yet
+
+    Continues after the invoices the user already has (numbered by count
+    before counters existed). Two first invoices racing each other both
+    land on the upsert, and the second one increments.
+    """
+    existing = session.exec(
+        select(func.count()).select_from(Invoice).where(Invoice.user_id == user_id)
+    ).one()
+
+    statement = dialect_insert(session, InvoiceCounter).values(user_id=user_id, last_number=existing + 1)
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"last_number": InvoiceCounter.last_number + 1}
+    ).returning(InvoiceCounter.last_number)
+    return session.execute(statement).scalar_one()
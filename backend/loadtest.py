@@ -0,0 +1,432 @@
+"""
+End-to-end load test for the whole API
+
+Boots `main:app` under uvicorn (or targets a running server with --url),
+seeds users with clients, projects and time entries through the API, then
+drives a mixed workload from concurrent virtual users and writes per-route
+latency percentiles and throughput to JSON, so runs can be diffed across
+commits.
+
+    python loadtest.py --concurrency 20 --duration 60 --output before.json
+    python loadtest.py --database-url postgresql://localhost/timetracker_load ...
+
+    # Invoice generation cost by invoice size
+    python loadtest.py --mix generate_invoice=1 --entries 3000 --invoice-size 1000 ...
+
+    # The same workload against the server of another commit (booted from a
+    # temporary git worktree), e.g. before and after the async session change
+    python loadtest.py --ref 5e62375^ --concurrency 100 --mix list_entries=10,list_projects=2,list_clients=1,timer=3 --output sync.json
+    python loadtest.py --ref 5e62375 --concurrency 100 --mix list_entries=10,list_projects=2,list_clients=1,timer=3 --output async.json
+
+Each virtual user owns one seeded account, so timers never collide.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PASSWORD = "loadtest-password"
+
+# Operation -> relative weight in the mix
+DEFAULT_MIX = {
+    "timer": 3,            # start + stop
+    "list_entries": 10,
+    "list_projects": 2,
+    "list_clients": 1,
+    "generate_invoice": 1,
+    "invoice_pdf": 1,
+    "login": 1,
+}
+
+# Line items per generated invoice (--invoice-size)
+INVOICE_SIZE = 10
+
+
+# ============================================
+# RESULTS
+# ============================================
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class Results:
+    """Latencies per route template, keyed "METHOD /path/{param}" """
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    def record(self, route: str, seconds: float, status_code: int) -> None:
+        if not self.recording:
+            return
+        self.latencies[route].append(seconds)
+        self.statuses[route][status_code] += 1
+        if status_code >= 400:
+            self.errors[route] += 1
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            routes[route] = {
+                "requests": len(values),
+                "errors": self.errors[route],
+                "statuses": {str(code): count for code, count in sorted(self.statuses[route].items())},
+                "rps": round(len(values) / elapsed, 2),
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+            }
+        everything = sorted(value for values in self.latencies.values() for value in values)
+        total = {
+            "requests": len(everything),
+            "errors": sum(self.errors.values()),
+            "rps": round(len(everything) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(everything, 50) * 1000, 2),
+            "p95_ms": round(percentile(everything, 95) * 1000, 2),
+            "p99_ms": round(percentile(everything, 99) * 1000, 2),
+        }
+        return {"total": total, "routes": routes}
+
+
+# ============================================
+# VIRTUAL USER
+# ============================================
+
+class VirtualUser:
+    """One seeded account and the ids it can act on"""
+
+    def __init__(self, client: httpx.AsyncClient, results: Results, email: str, invoice_size: int = INVOICE_SIZE):
+        self.client = client
+        self.results = results
+        self.email = email
+        self.invoice_size = invoice_size
+        self.headers: dict[str, str] = {}
+        self.projects: list[dict] = []
+        # client_id -> uninvoiced billable entry ids for that client's projects
+        self.unbilled: dict[str, list[str]] = defaultdict(list)
+        self.invoice_ids: list[str] = []
+
+    async def request(self, method: str, route: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        self.results.record(f"{method} {route}", time.perf_counter() - start, response.status_code)
+        return response
+
+    # --- seeding ---
+
+    async def register(self) -> None:
+        response = await self.client.post("/auth/register", json={
+            "email": self.email, "first_name": "Load", "last_name": "Test", "password": PASSWORD
+        })
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def seed(self, clients: int, projects_per_client: int, entries: int) -> None:
+        await self.register()
+        for c in range(clients):
+            response = await self.request("POST", "/clients/", "/clients/", json={"name": f"Client {c}"})
+            response.raise_for_status()
+            client_id = response.json()["id"]
+            for p in range(projects_per_client):
+                response = await self.request("POST", "/projects/", "/projects/", json={
+                    "name": f"Project {c}.{p}",
+                    "client_id": client_id,
+                    "hourly_rate": str(random.choice([75, 100, 125, 150, 200])),
+                })
+                response.raise_for_status()
+                self.projects.append(response.json())
+
+        # Back-to-back working days, three 3-hour slots a day (entries may not overlap)
+        today = datetime.now(timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0)
+        for i in range(entries):
+            project = random.choice(self.projects)
+            start = today - timedelta(days=1 + i // 3) + timedelta(hours=3 * (i % 3))
+            response = await self.request("POST", "/time-entries/manual", "/time-entries/manual", json={
+                "project_id": project["id"],
+                "description": "Seeded entry",
+                "start_time": start.isoformat(),
+                "duration_seconds": random.randint(15, 180) * 60,
+            })
+            response.raise_for_status()
+            self.unbilled[project["client_id"]].append(response.json()["id"])
+
+    # --- workload ---
+
+    async def timer(self) -> None:
+        project = random.choice(self.projects)
+        response = await self.request("POST", "/time-entries/timer/start", "/time-entries/timer/start", json={
+            "project_id": project["id"], "description": "Load test timer"
+        })
+        if response.status_code != 201:
+            return
+        response = await self.request("PATCH", "/time-entries/timer/stop", "/time-entries/timer/stop")
+        if response.status_code == 200:
+            self.unbilled[project["client_id"]].append(response.json()["id"])
+
+    async def list_entries(self) -> None:
+        await self.request("GET", "/time-entries/", "/time-entries/", params={"limit": 50})
+
+    async def list_projects(self) -> None:
+        await self.request("GET", "/projects/", "/projects/")
+
+    async def list_clients(self) -> None:
+        await self.request("GET", "/clients/", "/clients/")
+
+    async def generate_invoice(self) -> None:
+        candidates = [client_id for client_id, ids in self.unbilled.items() if ids]
+        if not candidates:
+            return await self.list_entries()
+        client_id = random.choice(candidates)
+        entry_ids = self.unbilled[client_id][:self.invoice_size]
+        del self.unbilled[client_id][:self.invoice_size]
+        response = await self.request("POST", "/invoices/generate", "/invoices/generate", json={
+            "client_id": client_id,
+            "time_entry_ids": entry_ids,
+            "issue_date": date.today().isoformat(),
+            "due_date": (date.today() + timedelta(days=30)).isoformat(),
+        })
+        if response.status_code == 201:
+            self.invoice_ids.append(response.json()["id"])
+
+    async def invoice_pdf(self) -> None:
+        if not self.invoice_ids:
+            return await self.generate_invoice()
+        invoice_id = random.choice(self.invoice_ids)
+        await self.request("GET", "/invoices/{invoice_id}/pdf", f"/invoices/{invoice_id}/pdf")
+
+    async def login(self) -> None:
+        await self.request("POST", "/auth/login", "/auth/login", json={"email": self.email, "password": PASSWORD})
+
+    async def run(self, operations: list[str], weights: list[int], deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            operation = random.choices(operations, weights)[0]
+            try:
+                await getattr(self, operation)()
+            except httpx.HTTPError as e:
+                self.results.record(f"{operation} (transport error)", 0.0, 599)
+                print(f"⚠️  {operation}: {e!r}", file=sys.stderr)
+
+
+# ============================================
+# SERVER
+# ============================================
+
+def start_server(database_url: str, port: int, workers: int, backend_dir: str = BACKEND_DIR) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    env.setdefault("SECRET_KEY", "loadtest-secret")
+    # Older trees log every statement (echo=True) to stdout
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=backend_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        # Graceful shutdown waits for requests stuck in a starved pool
+        server.kill()
+        server.wait()
+
+
+def add_worktree(ref: str) -> str:
+    """Check `ref` out into a temporary worktree; returns its backend directory"""
+    path = tempfile.mkdtemp(prefix="loadtest-worktree-")
+    subprocess.run(["git", "worktree", "add", "--detach", path, ref], cwd=BACKEND_DIR, check=True, capture_output=True)
+    return os.path.join(path, "backend")
+
+
+def remove_worktree(backend_dir: str) -> None:
+    subprocess.run(
+        ["git", "worktree", "remove", "--force", os.path.dirname(backend_dir)], cwd=BACKEND_DIR, capture_output=True
+    )
+
+
+async def wait_for_server(client: httpx.AsyncClient, server: Optional[subprocess.Popen], timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            response = await client.get("/health/db")
+            # Trees older than /health/db only start serving once the schema exists
+            if response.status_code == 404:
+                response = await client.get("/health")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("Server did not become healthy in time")
+
+
+def git_commit(ref: str = "HEAD") -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", ref], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ============================================
+# MAIN
+# ============================================
+
+def parse_mix(value: str) -> dict[str, int]:
+    """"timer=3,list_entries=10" -> weights (unlisted operations get 0)"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r} (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def run(args) -> dict:
+    server = None
+    worktree = None
+    url = args.url
+    if url is None:
+        if args.database_url is None:
+            args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='loadtest-'), 'loadtest.db')}"
+        url = f"http://127.0.0.1:{args.port}"
+        if args.ref:
+            worktree = add_worktree(args.ref)
+        server = start_server(args.database_url, args.port, args.workers, worktree or BACKEND_DIR)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = Results()
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+            await wait_for_server(client, server)
+
+            run_id = uuid.uuid4().hex[:8]
+            users = [
+                VirtualUser(client, results, f"loadtest-{run_id}-{i}@example.com", args.invoice_size)
+                for i in range(args.concurrency)
+            ]
+            print(f"🌱 Seeding {len(users)} users x {args.entries} entries...")
+            seed_start = time.perf_counter()
+            # Seeding is setup, not load: don't let it hit the limits being measured
+            seeding = asyncio.Semaphore(args.seed_concurrency)
+
+            async def seed(user: VirtualUser) -> None:
+                async with seeding:
+                    await user.seed(args.clients, args.projects, args.entries)
+
+            await asyncio.gather(*(seed(user) for user in users))
+            seed_seconds = time.perf_counter() - seed_start
+
+            operations = [name for name, weight in args.mix.items() if weight > 0]
+            weights = [args.mix[name] for name in operations]
+
+            if args.warmup:
+                print(f"🔥 Warming up for {args.warmup}s...")
+                deadline = time.perf_counter() + args.warmup
+                await asyncio.gather(*(user.run(operations, weights, deadline) for user in users))
+
+            print(f"🚀 Running {args.concurrency} virtual users for {args.duration}s...")
+            results.recording = True
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(*(user.run(operations, weights, deadline) for user in users))
+            elapsed = time.perf_counter() - start
+            results.recording = False
+    finally:
+        if server is not None:
+            stop_server(server)
+        if worktree is not None:
+            remove_worktree(worktree)
+
+    return {
+        "commit": git_commit(args.ref or "HEAD"),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "url": args.url,
+            "ref": args.ref,
+            "database": "external" if args.url else args.database_url.split("://")[0],
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "clients": args.clients,
+            "projects_per_client": args.projects,
+            "entries_per_user": args.entries,
+            "invoice_size": args.invoice_size,
+            "mix": args.mix,
+        },
+        "seed_seconds": round(seed_seconds, 2),
+        "elapsed_seconds": round(elapsed, 2),
+        **results.report(elapsed),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{'route':<40} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for route, stats in rows:
+        print(
+            f"{route:<40} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Time Tracker API")
+    parser.add_argument("--url", help="Target a running server instead of booting one")
+    parser.add_argument("--ref", help="Boot the server from this git commit instead of the working tree")
+    parser.add_argument("--database-url", help="Database for the booted server (default: a fresh SQLite file)")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=10, help="Virtual users, one account each")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before the run")
+    parser.add_argument("--seed-concurrency", type=int, default=10, help="Users seeded at the same time")
+    parser.add_argument("--clients", type=int, default=3, help="Clients per user")
+    parser.add_argument("--projects", type=int, default=2, help="Projects per client")
+    parser.add_argument("--entries", type=int, default=200, help="Seeded time entries per user")
+    parser.add_argument("--invoice-size", type=int, default=INVOICE_SIZE, help="Time entries per generated invoice")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. timer=3,list_entries=10,login=1")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--output", default="loadtest.json", help="JSON results file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✨ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
+import time
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
-from db import create_db_and_tables
+from db import create_db_and_tables, async_engine
 from routers import auth_routes, oauth, clients, projects, time_entries, invoices
 from contextlib import asynccontextmanager
-from config import SECRET_KEY, FRONTEND_URL
+from config import SECRET_KEY, FRONTEND_URL, N_PLUS_ONE_MODE
+from serialization import ORJSONResponse
+from passwords import password_hash_stats
+from pool_metrics import pool_stats
+from query_profiler import QueryProfilerMiddleware
+from metrics import MetricsMiddleware, render_metrics
+from n_plus_one import NPlusOneMiddleware
 
 # Load environment variables
 
@@ -34,7 +43,8 @@ app = FastAPI(
     title="Time Tracker API",
     description="Time tracking and invoice generation API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # ============================================
@@ -62,8 +72,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
+# ============================================
+# METRICS + QUERY PROFILER (Server-Timing header, slow-query log)
+# ============================================
+# Added first so it runs inside the profiler and can read the request's DB time
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryProfilerMiddleware)
+
+# Opt-in N+1 detection (N_PLUS_ONE_MODE=warn|strict), for development and tests
+if N_PLUS_ONE_MODE != "off":
+    app.add_middleware(NPlusOneMiddleware)
+
 # ============================================
 # INCLUDE ROUTERS
 # ============================================
@@ -92,4 +114,40 @@ def root():
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/auth")
+def auth_health():
+    """Password hashing pool: latency and queue depth"""
+    return password_hash_stats()
+
+
+@app.get("/health/db")
+async def db_health():
+    """Database round trip plus connection pool usage and checkout waits"""
+    start = time.perf_counter()
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "error": str(e), "pools": pool_stats()}
+        )
+    
+    return {
+        "status": "healthy",
+        "ping_ms": round((time.perf_counter() - start) * 1000, 3),
+        "pools": pool_stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition for this worker"""
+    pools = pool_stats()
+    return render_metrics({
+        **{f"db_pool_{name}": stats for name, stats in pools.items()},
+        "password_hash": password_hash_stats(),
+    })
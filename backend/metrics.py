@@ -0,0 +1,190 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from query_profiler import current_request_queries
+
+# Latency buckets in seconds (Prometheus default buckets)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label for requests that matched no route, so random paths can't create series
+UNMATCHED_ROUTE = "unmatched"
+
+
+# ============================================
+# METRIC TYPES
+# ============================================
+#
+# Every update happens on the event loop thread (the middleware below, and
+# /metrics itself is async), so the registry needs no locks. Each worker
+# process keeps its own registry; scrape every worker (or add a `worker`
+# target label) rather than aggregating across processes.
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, labelnames
+        self.series: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in self.series.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, labels: tuple, value: float) -> None:
+        self.series[labels] = value
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, labelnames
+        # labels -> [count per bucket (non-cumulative) ..., +Inf count, sum]
+        self.series: dict[tuple, list[float]] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(BUCKETS) + 2)
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                series[index] += 1
+                break
+        else:
+            series[len(BUCKETS)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*BUCKETS, "+Inf"), series[:-1]):
+                cumulative += count
+                bucket_labels = _format_labels((*self.labelnames, "le"), (*labels, bound))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            base_labels = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base_labels} {series[-1]}")
+            lines.append(f"{self.name}_count{base_labels} {cumulative}")
+        return lines
+
+
+# ============================================
+# REGISTRY
+# ============================================
+
+REQUESTS = Counter("http_requests_total", "Requests served", ("method", "route", "status"))
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency", ("method", "route"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served")
+DB_SECONDS = Histogram("http_request_db_seconds", "Database time per request", ("method", "route"))
+# Rendering by ORJSONResponse; FastAPI serializes response_model routes
+# itself, out of reach
+SERIALIZATION_SECONDS = Histogram(
+    "http_request_serialization_seconds", "Response serialization time per request", ("method", "route")
+)
+
+METRICS = [REQUESTS, REQUEST_SECONDS, IN_FLIGHT, DB_SECONDS, SERIALIZATION_SECONDS]
+IN_FLIGHT.set((), 0)
+
+
+# ============================================
+# PER-REQUEST TIMINGS
+# ============================================
+
+class RequestTimings:
+    serialization_seconds: float = 0.0
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_request_timings", default=None)
+
+
+def record_serialization(seconds: float) -> None:
+    """Add to the current request's serialization time (no-op outside a request)"""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.serialization_seconds += seconds
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class MetricsMiddleware:
+    """
+    Request count, latency, DB and serialization time per route template
+
+    Must run inside QueryProfilerMiddleware, which collects the DB time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.inc(amount=-1)
+            _current_timings.reset(token)
+
+            # Route template (/time-entries/{entry_id}), never the raw path
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", UNMATCHED_ROUTE))
+            REQUESTS.inc((*labels, status_code))
+            REQUEST_SECONDS.observe(labels, elapsed)
+            SERIALIZATION_SECONDS.observe(labels, timings.serialization_seconds)
+            queries = current_request_queries()
+            if queries is not None:
+                DB_SECONDS.observe(labels, queries.total_seconds)
+
+
+# ============================================
+# EXPOSITION
+# ============================================
+
+def render_metrics(extra_gauges: dict[str, dict[str, float]]) -> str:
+    """
+    Prometheus text format for the registry plus point-in-time gauges
+
+    extra_gauges maps a metric prefix to {name: value}, e.g. pool stats
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for prefix, values in extra_gauges.items():
+        for name, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
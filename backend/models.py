@@ -1,7 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship, func
-from sqlalchemy import DateTime, Column
+from sqlalchemy import DateTime, Column, Index, TypeDecorator, func as sa_func
 from typing import Optional
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from uuid import UUID, uuid4
 from enum import Enum
 from decimal import Decimal
@@ -23,6 +23,34 @@ class InvoiceStatus(str, Enum):
     PAID = "paid"
     OVERDUE = "overdue"
 
+# ============================================
+# COLUMN TYPES
+# ============================================
+
+class AwareDateTime(TypeDecorator):
+    """
+    timestamptz that always reads back timezone-aware, in UTC
+
+    Declared explicitly because SQLModel's mapping of a bare datetime varies
+    by version (older ones create timestamp without time zone; db.py
+    migrates such columns). SQLite keeps no offset, so values are stored
+    as UTC and read back as UTC; naive values are taken to be UTC.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc)
+
+    def process_result_value(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
 # ============================================
 # DATABASE MODELS (SQLModel with table=True)
 # ============================================
@@ -195,8 +223,8 @@ class TimeEntry(SQLModel, table=True):
     )
 
     # Time tracking
-    start_time: datetime = Field(index=True)
-    end_time: Optional[datetime] = None
+    start_time: datetime = Field(index=True, sa_type=AwareDateTime)  # type: ignore
+    end_time: Optional[datetime] = Field(default=None, sa_type=AwareDateTime)  # type: ignore
     duration_seconds: Optional[int] = None
 
     description: Optional[str] = Field(default=None, max_length=500)
@@ -251,7 +279,7 @@ class Invoice(SQLModel, table=True):
     client_id: UUID = Field(foreign_key="client.id", index=True)
     
     # Invoice Details
-    invoice_number: str = Field(unique=True, index=True, max_length=50)
+    invoice_number: str = Field(max_length=50)  # unique per user, see uq_invoice_user_number
     status: InvoiceStatus = Field(default=InvoiceStatus.DRAFT, index=True)
     
     # Dates
@@ -335,4 +363,118 @@ class InvoiceLineItem(SQLModel, table=True):
     )
     
     # Relationships
-    invoice: Optional["Invoice"] = Relationship(back_populates="line_items")
\ No newline at end of file
+    invoice: Optional["Invoice"] = Relationship(back_populates="line_items")
+
+
+# Invoice Number Counter Table
+class InvoiceCounter(SQLModel, table=True):
+    """
+    Last invoice number handed out per user.
+    Incremented atomically by invoice_numbers.py, so numbering never
+    has to count the user's invoices.
+    """
+    __tablename__ = "invoice_counter"  # type: ignore
+    
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    last_number: int = Field(default=0)
+
+
+# ============================================
+# REPORTING MODELS
+# ============================================
+
+# Daily Rollup Table
+class DailyRollup(SQLModel, table=True):
+    """
+    Per user, project and day totals of completed time entries.
+    Kept in step with time entry and invoice writes by rollups.py,
+    so reports read one row per day instead of every entry.
+    """
+    __tablename__ = "daily_rollup"  # type: ignore
+    
+    # Composite primary key
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    project_id: UUID = Field(foreign_key="project.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    
+    # Totals
+    entry_count: int = Field(default=0)
+    total_seconds: int = Field(default=0)
+    billable_seconds: int = Field(default=0)
+    invoiced_seconds: int = Field(default=0)
+
+
+# ============================================
+# COMPOSITE / PARTIAL INDEXES
+# ============================================
+# Shaped after the router queries: always scoped to one user, filtered on the
+# soft-delete flag and ordered newest first. Partial predicates are written as
+# model expressions so they render exactly like the WHERE clauses the routers
+# emit, which lets the planner prove the index applies.
+
+# Time entry lists: user_id = ? AND is_active ORDER BY start_time DESC, id DESC
+Index(
+    "ix_timeentry_user_start_active",
+    TimeEntry.user_id, TimeEntry.start_time, TimeEntry.id,
+    postgresql_where=(TimeEntry.is_active == True),
+    sqlite_where=(TimeEntry.is_active == True),
+)
+
+# Running timer lookup: user_id = ? AND end_time IS NULL AND is_active.
+# Unique, so the database itself allows at most one running timer per user.
+Index(
+    "uq_timeentry_user_running",
+    TimeEntry.user_id,
+    unique=True,
+    postgresql_where=(TimeEntry.end_time == None) & (TimeEntry.is_active == True),
+    sqlite_where=(TimeEntry.end_time == None) & (TimeEntry.is_active == True),
+)
+
+# Unbilled work awaiting an invoice
+Index(
+    "ix_timeentry_user_uninvoiced",
+    TimeEntry.user_id, TimeEntry.start_time,
+    postgresql_where=(TimeEntry.is_active == True) & (TimeEntry.is_billable == True) & (TimeEntry.is_invoiced == False),
+    sqlite_where=(TimeEntry.is_active == True) & (TimeEntry.is_billable == True) & (TimeEntry.is_invoiced == False),
+)
+
+def time_entry_range(start_time, end_time):
+    """
+    Range expression of an entry's [start_time, end_time) (Postgres)
+    
+    tstzrange over the timestamptz columns is immutable, so it can be
+    indexed. Queries must build this exact expression for the planner to
+    match the index below.
+    """
+    return sa_func.tstzrange(start_time, end_time)
+
+
+# Overlap checks (Postgres only): time ranges of active entries, running
+# timers being open-ended. Queried with the && operator.
+Index(
+    "ix_timeentry_active_range",
+    time_entry_range(TimeEntry.start_time, TimeEntry.end_time),
+    postgresql_using="gist",
+    postgresql_where=(TimeEntry.is_active == True),
+).ddl_if(dialect="postgresql")
+
+# Invoice lists: user_id = ? AND is_active ORDER BY issue_date DESC, id DESC
+Index(
+    "ix_invoice_user_issue_date_active",
+    Invoice.user_id, Invoice.issue_date, Invoice.id,
+    postgresql_where=(Invoice.is_active == True),
+    sqlite_where=(Invoice.is_active == True),
+)
+
+# Invoice numbers restart for every user
+Index(
+    "uq_invoice_user_number",
+    Invoice.user_id, Invoice.invoice_number,
+    unique=True,
+)
+
+# Project lists: user_id = ? ORDER BY created_at DESC
+Index(
+    "ix_project_user_created_at",
+    Project.user_id, Project.created_at,
+)
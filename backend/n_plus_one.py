@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import greenlet
+from sqlalchemy import event
+
+from config import N_PLUS_ONE_MODE, N_PLUS_ONE_THRESHOLD
+from query_profiler import normalize_sql
+
+logger = logging.getLogger("timetracker.sql")
+
+ROUTERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routers")
+
+
+class NPlusOneError(Exception):
+    """Raised in strict mode when a request repeats the same query shape"""
+
+
+# ============================================
+# ORIGIN LOOKUP
+# ============================================
+
+def _router_frame(frames) -> Optional[str]:
+    """file:line of the last frame (in iteration order) inside routers/"""
+    origin = None
+    for frame in frames:
+        if frame.f_code.co_filename.startswith(ROUTERS_DIR):
+            origin = f"{os.path.relpath(frame.f_code.co_filename, os.path.dirname(ROUTERS_DIR))}:{frame.f_lineno}"
+    return origin
+
+
+def _stack_frames(frame):
+    """`frame` and its callers, outermost first"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return reversed(frames)
+
+
+def _greenlet_parent_frames():
+    """
+    Caller frames of an async query
+
+    AsyncSession runs each query in a child greenlet, whose own stack starts
+    at greenlet_spawn; the route coroutine is on the parent greenlet's stack
+    """
+    parent = greenlet.getcurrent().parent
+    if parent is None or parent.gr_frame is None:
+        return []
+    return _stack_frames(parent.gr_frame)
+
+
+def statement_origin() -> str:
+    """
+    Router line that issued the statement being executed
+
+    Sync routes run the query on their own stack; async routes on a child
+    greenlet, so fall back to the stack that spawned it.
+    """
+    return (
+        _router_frame(_stack_frames(sys._getframe(1)))
+        or _router_frame(_greenlet_parent_frames())
+        or "unknown"
+    )
+
+
+# ============================================
+# PER-REQUEST DETECTION
+# ============================================
+
+class RequestFingerprints:
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+
+
+_current_request: ContextVar[Optional[RequestFingerprints]] = ContextVar("current_request_fingerprints", default=None)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    fingerprints = _current_request.get()
+    if fingerprints is None:
+        return
+
+    shape = normalize_sql(statement)
+    fingerprints.counts[shape] += 1
+    # Report each shape once per request, when it crosses the threshold
+    if fingerprints.counts[shape] != N_PLUS_ONE_THRESHOLD:
+        return
+
+    origin = statement_origin()
+    if N_PLUS_ONE_MODE == "strict":
+        raise NPlusOneError(f"Query repeated {N_PLUS_ONE_THRESHOLD}x from {origin}: {shape}")
+    logger.warning(json.dumps({
+        "event": "n_plus_one",
+        "count": N_PLUS_ONE_THRESHOLD,
+        "origin": origin,
+        "sql": shape,
+    }))
+
+
+@contextmanager
+def suppress() -> Iterator[None]:
+    """
+    Don't fingerprint statements run inside the block
+
+    For deliberate chunked loops (an import inserting one chunk per round
+    trip), which repeat the same statements by design
+    """
+    token = _current_request.set(None)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+def instrument_engine(engine) -> None:
+    """Fingerprint statements on `engine` (no-op unless N_PLUS_ONE_MODE is warn/strict)"""
+    if N_PLUS_ONE_MODE in ("warn", "strict"):
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class NPlusOneMiddleware:
+    """
+    Flags requests that run the same query shape N_PLUS_ONE_THRESHOLD times
+
+    Opt-in for development and tests (N_PLUS_ONE_MODE=warn logs, strict
+    raises NPlusOneError so the test client fails the test)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_request.set(RequestFingerprints())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_request.reset(token)
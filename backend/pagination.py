@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+
+# Header used to hand the next page's cursor back to the client
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# ============================================
+# KEYSET CURSORS
+# ============================================
+
+def encode_cursor(sort_value: date | datetime, row_id: UUID) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor
+
+    The cursor is URL-safe base64 of (sort_value, id), so the next page can
+    seek straight to that position in the index instead of using OFFSET.
+    """
+    payload = json.dumps([sort_value.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_type: type[date] | type[datetime]) -> tuple[Any, UUID]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises a 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_raw, id_raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sort_type.fromisoformat(sort_raw), UUID(id_raw)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next page's cursor on the response (omitted on the last page)"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from auth import pwd_context
+from config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+
+T = TypeVar("T")
+
+# bcrypt releases the GIL, so threads hash in parallel without touching the
+# request threadpool or the event loop
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+_lock = threading.Lock()
+_pending = 0
+_stats = {"completed": 0, "rejected": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+
+
+# ============================================
+# BOUNDED EXECUTOR
+# ============================================
+
+async def _run_hashing(fn: Callable[..., T], *args) -> T:
+    """Run a bcrypt call on the hashing pool, or 503 if too many are waiting"""
+    global _pending
+    with _lock:
+        if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+            _stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        _pending += 1
+    
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _pending -= 1
+            _stats["completed"] += 1
+            _stats["total_seconds"] += elapsed
+            _stats["max_seconds"] = max(_stats["max_seconds"], elapsed)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a new password with the configured scheme and cost"""
+    return await _run_hashing(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password; returns (valid, new_hash)
+    
+    new_hash is set when the stored hash uses an outdated scheme or cost and
+    should be replaced (only ever for a valid password)
+    """
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+# ============================================
+# METRICS
+# ============================================
+
+def password_hash_stats() -> dict:
+    """Hashing latency and queue depth since startup"""
+    with _lock:
+        completed = _stats["completed"]
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "max_queue": PASSWORD_HASH_MAX_QUEUE,
+            "in_flight": min(_pending, PASSWORD_HASH_WORKERS),
+            "queue_depth": max(0, _pending - PASSWORD_HASH_WORKERS),
+            "completed": completed,
+            "rejected": _stats["rejected"],
+            "avg_seconds": round(_stats["total_seconds"] / completed, 4) if completed else 0.0,
+            "max_seconds": round(_stats["max_seconds"], 4),
+        }
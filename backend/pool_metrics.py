@@ -0,0 +1,106 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Counters for one engine's pool, updated from pool events"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.wait_total_seconds = 0.0
+        self.wait_max_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool) -> None:
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.wait_total_seconds += seconds
+            self.wait_max_seconds = max(self.wait_max_seconds, seconds)
+
+    def record_checkout(self, checked_out: int) -> None:
+        with self.lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+
+# ============================================
+# INSTRUMENTED POOLS
+# ============================================
+
+class TimedCheckoutMixin:
+    """Times how long each checkout waits for a free connection"""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start, timed_out=False)
+        return record
+
+    def recreate(self):
+        # Keep the counters when the pool is rebuilt (e.g. after a disconnect)
+        pool = super().recreate()  # type: ignore[misc]
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_pools: dict[str, QueuePool] = {}
+
+
+def instrument_pool(name: str, engine) -> None:
+    """Start collecting stats for an engine created with an instrumented poolclass"""
+    pool = engine.pool
+    pool.stats = PoolStats()
+    _pools[name] = pool
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        # Look the pool up again: the engine may have swapped in a recreated one
+        engine.pool.stats.record_checkout(engine.pool.checkedout())
+        _pools[name] = engine.pool
+
+
+# ============================================
+# REPORT
+# ============================================
+
+def pool_stats() -> dict:
+    """Live size/usage plus cumulative checkout waits for each instrumented pool"""
+    report = {}
+    for name, pool in _pools.items():
+        stats: PoolStats = pool.stats  # type: ignore[attr-defined]
+        with stats.lock:
+            waits = stats.checkouts or 1
+            report[name] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+                "peak_checked_out": stats.peak_checked_out,
+                "checkouts": stats.checkouts,
+                "timeouts": stats.timeouts,
+                "wait_avg_ms": round(stats.wait_total_seconds / waits * 1000, 3),
+                "wait_max_ms": round(stats.wait_max_seconds * 1000, 3),
+            }
+    return report
@@ -0,0 +1,155 @@
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from config import SLOW_QUERY_MS, QUERY_PROFILER_TOP
+
+logger = logging.getLogger("timetracker.sql")
+
+
+# ============================================
+# SQL NORMALIZATION
+# ============================================
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|(?<!:):\w+|\?|%s")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """
+    Statement shape with literals and parameters replaced by `?`
+
+    IN lists of any length collapse to `(?...)`, so the same query with a
+    different number of ids normalizes to the same text
+    """
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(?...)", sql)
+
+
+# ============================================
+# PER-REQUEST RECORDING
+# ============================================
+
+class RequestQueries:
+    """Statements executed while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        # (seconds, raw statement), slowest first, at most QUERY_PROFILER_TOP
+        self._slowest: list[tuple[float, str]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if len(self._slowest) < QUERY_PROFILER_TOP or seconds > self._slowest[-1][0]:
+            self._slowest.append((seconds, statement))
+            self._slowest.sort(key=lambda item: item[0], reverse=True)
+            del self._slowest[QUERY_PROFILER_TOP:]
+
+    @property
+    def slowest(self) -> list[dict]:
+        """Slowest statements, normalized (only computed when asked for)"""
+        return [
+            {"ms": round(seconds * 1000, 3), "sql": normalize_sql(statement)}
+            for seconds, statement in self._slowest
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+# Shared (not copied) with the threadpool and run_sync greenlets serving the request
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request_queries", default=None)
+
+
+def current_request_queries() -> Optional[RequestQueries]:
+    """Queries of the request being served, or None outside a request"""
+    return _current_request.get()
+
+
+# ============================================
+# ENGINE HOOKS
+# ============================================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_start_times"].pop()
+
+    queries = _current_request.get()
+    if queries is not None:
+        queries.record(statement, seconds)
+
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "ms": round(seconds * 1000, 3),
+            "sql": normalize_sql(statement),
+            "executemany": executemany,
+        }))
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement on `engine` (pass async_engine.sync_engine for async)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class QueryProfilerMiddleware:
+    """
+    Collects each request's queries and reports them in a Server-Timing header
+
+    Statements issued after the headers are sent (streamed exports) still
+    count towards the request log line, just not the header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = _current_request.set(queries)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", queries.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            if queries.count and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(json.dumps({
+                    "event": "request_queries",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "count": queries.count,
+                    "db_ms": round(queries.total_seconds * 1000, 3),
+                    "slowest": queries.slowest,
+                }))
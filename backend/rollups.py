@@ -0,0 +1,229 @@
+import argparse
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Date, case, cast, delete, func, insert
+from sqlmodel import Session, select
+
+from db import dialect_insert
+from models import DailyRollup, TimeEntry
+from budgets import mark_projects_changed, invalidate_all_project_consumption
+
+# (user_id, project_id, day) -> [entry_count, total_seconds, billable_seconds, invoiced_seconds]
+RollupKey = tuple[UUID, UUID, date]
+RollupDeltas = dict[RollupKey, list[int]]
+
+MEASURES = ("entry_count", "total_seconds", "billable_seconds", "invoiced_seconds")
+
+
+# ============================================
+# HELPERS: Contributions
+# ============================================
+
+def new_deltas() -> RollupDeltas:
+    return defaultdict(lambda: [0, 0, 0, 0])
+
+
+def entry_day(start_time: datetime) -> date:
+    """The rollup day of an entry (UTC calendar day of its start)"""
+    if start_time.tzinfo:
+        start_time = start_time.astimezone(timezone.utc)
+    return start_time.date()
+
+
+def sql_day(column, dialect_name: str):
+    """
+    SQL expression matching entry_day()
+
+    SQLite stores UTC; Postgres would cast a timestamptz in the session's
+    TimeZone, so the value is shifted to UTC first
+    """
+    if dialect_name == "sqlite":
+        return func.date(column)
+    return cast(func.timezone("UTC", column), Date)
+
+
+def add_contribution(
+    deltas: RollupDeltas,
+    user_id: UUID,
+    project_id: UUID,
+    start_time: datetime,
+    duration_seconds: Optional[int],
+    is_billable: bool,
+    is_invoiced: bool,
+    sign: int = 1
+) -> None:
+    """Add (or with sign=-1, remove) one completed entry's share of the rollups"""
+    seconds = duration_seconds or 0
+    totals = deltas[(user_id, project_id, entry_day(start_time))]
+    totals[0] += sign
+    totals[1] += sign * seconds
+    totals[2] += sign * seconds if is_billable else 0
+    totals[3] += sign * seconds if is_invoiced else 0
+
+
+def add_entry(deltas: RollupDeltas, entry: TimeEntry, sign: int = 1) -> None:
+    """Add an entry's share if it counts (active and not a running timer)"""
+    if not entry.is_active or entry.end_time is None:
+        return
+    add_contribution(
+        deltas, entry.user_id, entry.project_id, entry.start_time,
+        entry.duration_seconds, entry.is_billable, entry.is_invoiced, sign
+    )
+
+
+def entry_contribution(entry: TimeEntry) -> RollupDeltas:
+    """Snapshot an entry's share before changing it (see apply_entry_change)"""
+    deltas = new_deltas()
+    add_entry(deltas, entry)
+    return deltas
+
+
+def aggregate_contribution(session: Session, conditions: list) -> RollupDeltas:
+    """
+    Share of all entries matching `conditions`, computed with one GROUP BY
+
+    Used by set-based writes that never load the rows they change
+    """
+    day = sql_day(TimeEntry.start_time, session.get_bind().dialect.name)
+    seconds = func.coalesce(TimeEntry.duration_seconds, 0)
+    statement = (
+        select(
+            TimeEntry.user_id, TimeEntry.project_id, day.label("day"),
+            func.count(),
+            func.sum(seconds),
+            func.sum(case((TimeEntry.is_billable == True, seconds), else_=0)),
+            func.sum(case((TimeEntry.is_invoiced == True, seconds), else_=0)),
+        )
+        .where(*conditions, TimeEntry.is_active == True, TimeEntry.end_time != None)
+        .group_by(TimeEntry.user_id, TimeEntry.project_id, day)
+    )
+
+    deltas = new_deltas()
+    for user_id, project_id, row_day, *totals in session.exec(statement).all():  # type: ignore
+        if isinstance(row_day, str):
+            row_day = date.fromisoformat(row_day)
+        deltas[(user_id, project_id, row_day)] = [int(value or 0) for value in totals]
+    return deltas
+
+
+# ============================================
+# WRITES
+# ============================================
+
+def apply_rollup_deltas(session: Session, deltas: RollupDeltas) -> None:
+    """
+    Add the deltas onto the rollup table in the caller's transaction
+
+    Uses an atomic upsert so concurrent writers never lose increments
+    """
+    rows = [
+        dict(user_id=user_id, project_id=project_id, day=day, **dict(zip(MEASURES, totals)))
+        for (user_id, project_id, day), totals in deltas.items()
+        if any(totals)
+    ]
+    if not rows:
+        return
+
+    statement = dialect_insert(session, DailyRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "project_id", "day"],
+        set_={
+            measure: getattr(DailyRollup, measure) + getattr(statement.excluded, measure)
+            for measure in MEASURES
+        }
+    )
+    session.execute(statement, rows)
+    
+    mark_projects_changed(
+        session, (row["project_id"] for row in rows), (row["user_id"] for row in rows)
+    )
+
+
+def apply_entry_change(session: Session, before: Optional[RollupDeltas], entry: Optional[TimeEntry]) -> None:
+    """Move an entry's share from its `before` snapshot to its current state"""
+    deltas = new_deltas()
+    for key, totals in (before or {}).items():
+        deltas[key] = [-value for value in totals]
+    if entry is not None:
+        add_entry(deltas, entry)
+    apply_rollup_deltas(session, deltas)
+
+
+# ============================================
+# MAINTENANCE: Rebuild / Check
+# ============================================
+
+def rebuild_rollups(session: Session, user_id: Optional[UUID] = None) -> int:
+    """Recompute rollups from raw entries (backfill / repair). Returns rows written."""
+    scope = [TimeEntry.user_id == user_id] if user_id else []
+
+    delete_statement = delete(DailyRollup)
+    if user_id:
+        delete_statement = delete_statement.where(DailyRollup.user_id == user_id)  # type: ignore
+    session.execute(delete_statement)
+
+    day = sql_day(TimeEntry.start_time, session.get_bind().dialect.name)
+    seconds = func.coalesce(TimeEntry.duration_seconds, 0)
+    aggregate = (
+        select(
+            TimeEntry.user_id, TimeEntry.project_id, day,
+            func.count(),
+            func.sum(seconds),
+            func.sum(case((TimeEntry.is_billable == True, seconds), else_=0)),
+            func.sum(case((TimeEntry.is_invoiced == True, seconds), else_=0)),
+        )
+        .where(*scope, TimeEntry.is_active == True, TimeEntry.end_time != None)
+        .group_by(TimeEntry.user_id, TimeEntry.project_id, day)
+    )
+    result = session.execute(
+        insert(DailyRollup).from_select(["user_id", "project_id", "day", *MEASURES], aggregate)
+    )
+    session.commit()
+    invalidate_all_project_consumption()
+    return result.rowcount
+
+
+def check_rollups(session: Session, user_id: Optional[UUID] = None) -> list[tuple[RollupKey, list[int], list[int]]]:
+    """Compare rollups against raw entries. Returns (key, expected, stored) for each mismatch."""
+    scope = [TimeEntry.user_id == user_id] if user_id else []
+    expected = aggregate_contribution(session, scope)
+
+    statement = select(DailyRollup)
+    if user_id:
+        statement = statement.where(DailyRollup.user_id == user_id)
+    stored = {
+        (row.user_id, row.project_id, row.day): [getattr(row, measure) for measure in MEASURES]
+        for row in session.exec(statement).all()
+    }
+
+    mismatches = []
+    for key in set(expected) | set(stored):
+        expected_totals = expected.get(key, [0, 0, 0, 0])
+        stored_totals = stored.get(key, [0, 0, 0, 0])
+        if expected_totals != stored_totals:
+            mismatches.append((key, expected_totals, stored_totals))
+    return mismatches
+
+
+if __name__ == "__main__":
+    from db import engine
+
+    parser = argparse.ArgumentParser(description="Maintain the daily_rollup table")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--user-id", type=UUID, default=None, help="Limit to one user")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.command == "rebuild":
+            count = rebuild_rollups(session, args.user_id)
+            print(f"✅ Rebuilt {count} rollup rows")
+        else:
+            mismatches = check_rollups(session, args.user_id)
+            for (user_id, project_id, day), expected_totals, stored_totals in mismatches:
+                print(f"❌ {user_id} {project_id} {day}: expected {expected_totals}, stored {stored_totals}")
+            if mismatches:
+                raise SystemExit(1)
+            print("✅ Rollups are consistent")
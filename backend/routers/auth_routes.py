@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone
 
-from auth import verify_password, hash_password, get_current_user, create_access_token
+from auth import get_current_user, create_access_token, invalidate_cached_user
+from passwords import hash_password_async, verify_password_async
 from models import User
 from api_types import UserCreate, UserLogin, UserResponse, Token
-from db import get_session
+from db import get_async_session
 
 # router
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -15,13 +17,13 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 # ============================================
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserCreate, session:Session=Depends(get_session)):
+async def register_user(user_data: UserCreate, session:AsyncSession=Depends(get_async_session)):
     
     """Registering a new user"""
     
     # Query
     statement = select(User).where(User.email == user_data.email)
-    existing_user = session.exec(statement=statement).first()
+    existing_user = (await session.exec(statement=statement)).first()
     
     if existing_user:
         raise HTTPException(
@@ -29,7 +31,8 @@ def register_user(user_data: UserCreate, session:Session=Depends(get_session)):
             detail="User already exists with this email."
         )
         
-    hashed_password = hash_password(user_data.password)
+    # Hashed on the bounded password pool (503 when saturated)
+    hashed_password = await hash_password_async(user_data.password)
     
     new_user = User(
         email=user_data.email,
@@ -41,8 +44,8 @@ def register_user(user_data: UserCreate, session:Session=Depends(get_session)):
     )
     
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     
     token = create_access_token(data={"sub": str(new_user.id)})
     
@@ -60,17 +63,17 @@ def register_user(user_data: UserCreate, session:Session=Depends(get_session)):
 # ============================================
 
 @router.post("/login", response_model=Token)
-def login_user(login_data: UserLogin, session:Session=Depends(get_session)):
+async def login_user(login_data: UserLogin, session:AsyncSession=Depends(get_async_session)):
     """
     Login with email and password
     
     - Finds user by email
-    - Verifies password
+    - Verifies password (rehashing it if the configured cost changed)
     - Returns JWT token
     """
     
     statement = select(User).where(User.email == login_data.email)
-    user = session.exec(statement=statement).first()
+    user = (await session.exec(statement=statement)).first()
     
     # Check if user exists and password is correct
     if not user or not user.hashed_password:
@@ -79,12 +82,20 @@ def login_user(login_data: UserLogin, session:Session=Depends(get_session)):
             detail="Incorrect email or password"
         )
     
-    if not verify_password(login_data.password, user.hashed_password):
+    is_valid, new_hash = await verify_password_async(login_data.password, user.hashed_password)
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    # Transparently upgrade hashes made with an old scheme or cost
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
+        invalidate_cached_user(user.id)
+    
     token = create_access_token(data={"sub": str(user.id)})
     
     return Token(
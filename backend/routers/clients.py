@@ -1,20 +1,22 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from typing import List
-from sqlmodel import Session, select, desc
+from sqlmodel import select, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 
-from db import get_session
+from db import get_async_session
 from models import User, Client
 from api_types import ClientCreate, ClientResponse, ClientUpdate
 from auth import get_current_user
+from etags import collection_etag, make_etag, not_modified
 
 # router
 router = APIRouter(prefix="/clients", tags=["Clients"])
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=ClientResponse)
-def create_client_entry(
+async def create_client_entry(
     client_data: ClientCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     new_client = Client(
@@ -22,18 +24,27 @@ def create_client_entry(
         user_id=current_user.id      
     )
     session.add(new_client)
-    session.commit()
-    session.refresh(new_client)
+    await session.commit()
+    await session.refresh(new_client)
         
     return new_client
 
 @router.get("/", status_code=status.HTTP_200_OK, response_model=List[ClientResponse])
-def get_all_clients(
+async def get_all_clients(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    statement = select(Client).where(Client.user_id == current_user.id, Client.is_active).order_by(desc(Client.created_at))
-    all_clients = session.exec(statement).all()
+    conditions = [Client.user_id == current_user.id, Client.is_active]
+    
+    etag = await session.run_sync(collection_etag, [(Client, conditions)])
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    statement = select(Client).where(*conditions).order_by(desc(Client.created_at))
+    all_clients = (await session.exec(statement)).all()
     
     # NOTE:
         # Pagination (limit/offset or cursor-based) can be added later if the number of
@@ -43,29 +54,35 @@ def get_all_clients(
     return all_clients
 
 @router.get("/{client_id}", status_code=status.HTTP_200_OK, response_model=ClientResponse)
-def get_client(
+async def get_client(
     client_id: UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     statement = select(Client).where(Client.id == (client_id) , Client.user_id == current_user.id, Client.is_active)
-    client = session.exec(statement).first()
+    client = (await session.exec(statement)).first()
     
     if not client:
         raise HTTPException(404, detail="Client not found!")
     
+    cached = not_modified(request, response, make_etag(client.id, client.updated_at))
+    if cached:
+        return cached
+    
     return client
     
     
 @router.patch("/{client_id}", status_code=status.HTTP_200_OK, response_model=ClientResponse)
-def update_client(
+async def update_client(
     client_id: UUID,
     client_updated_data: ClientUpdate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     statement = select(Client).where(Client.id == (client_id) , Client.user_id == current_user.id, Client.is_active == True)
-    client = session.exec(statement).first()
+    client = (await session.exec(statement)).first()
     
     if not client:
         raise HTTPException(404, detail="Client not found!")
@@ -76,19 +93,19 @@ def update_client(
         setattr(client, key, value)
         
     session.add(client)
-    session.commit()
-    session.refresh(client)
+    await session.commit()
+    await session.refresh(client)
     
     return client
 
 @router.delete('/{client_id}', status_code=status.HTTP_204_NO_CONTENT)
-def delete_client(
+async def delete_client(
     client_id: UUID,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     statement = select(Client).where(Client.id == (client_id) , Client.user_id == current_user.id, Client.is_active == True)
-    client = session.exec(statement).first()
+    client = (await session.exec(statement)).first()
     
     if not client:
         raise HTTPException(404, detail="Client not found!")
@@ -96,5 +113,5 @@ def delete_client(
     client.is_active = False
     
     session.add(client)
-    session.commit()
+    await session.commit()
     # session.refresh(client)
\ No newline at end of file
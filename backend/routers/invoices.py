@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from sqlmodel import Session, select, desc, func as sql_func
+from sqlmodel import Session, select, desc
+from sqlalchemy import tuple_, insert, update
+from sqlalchemy.orm.attributes import set_committed_value
 from uuid import UUID
+from datetime import date
 from decimal import Decimal
 from io import BytesIO
 
@@ -18,28 +21,16 @@ from models import (
 )
 from api_types import (
     InvoiceCreate, InvoiceUpdate, InvoiceResponse, 
-    InvoiceWithDetails, InvoiceLineItemResponse, 
-    InvoiceStatus, ClientResponse
+    InvoiceWithDetails, InvoiceStatus
 )
 from auth import get_current_user
+from pagination import encode_cursor, decode_cursor, set_next_cursor
+from rollups import new_deltas, add_entry, apply_rollup_deltas
+from etags import collection_etag, make_etag, not_modified
+from invoice_numbers import next_invoice_number
 
 router = APIRouter(prefix="/invoices", tags=["Invoices"])
 
-# ============================================
-# HELPER: Generate Invoice Number
-# ============================================
-
-def generate_invoice_number(session: Session, user_id: UUID) -> str:
-    """
-    Generate unique invoice number for user
-    Format: INV-001, INV-002, etc.
-    """
-    statement = select(sql_func.count()).select_from(Invoice).where(Invoice.user_id == user_id)
-    count = session.exec(statement).one()
-    next_number = count + 1
-    return f"INV-{next_number:03d}"
-
-
 # ============================================
 # HELPER: Calculate Invoice Totals
 # ============================================
@@ -63,29 +54,14 @@ def calculate_invoice_totals(subtotal: Decimal, tax_rate: Decimal) -> tuple[Deci
 # HELPER: Load Invoice with Details
 # ============================================
 
-def load_invoice_with_details(session: Session, invoice_id: UUID) -> dict:
-    """Load invoice with client and line items"""
+def load_invoice_with_details(session: Session, invoice_id: UUID) -> InvoiceWithDetails:
+    """Load invoice with client and line items (validated once, no dict round trip)"""
     invoice = session.get(Invoice, invoice_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
-    invoice_dict = InvoiceWithDetails.model_validate(invoice).model_dump()
-    
-    # Load client
-    if invoice.client_id:
-        client = session.get(Client, invoice.client_id)
-        if client:
-            invoice_dict['client'] = ClientResponse.model_validate(client).model_dump()
-    
-    # Load line items
-    statement = select(InvoiceLineItem).where(InvoiceLineItem.invoice_id == invoice_id)
-    line_items = session.exec(statement).all()
-    invoice_dict['line_items'] = [
-        InvoiceLineItemResponse.model_validate(item).model_dump()
-        for item in line_items
-    ]
-    
-    return invoice_dict
+    # Client and line items are read through the relationships (one query each)
+    return InvoiceWithDetails.model_validate(invoice)
 
 
 # ============================================
@@ -114,17 +90,27 @@ def generate_invoice(
             detail="Client not found"
         )
     
+    # Load every requested entry with its project in one query
+    entry_ids = list(dict.fromkeys(invoice_data.time_entry_ids))
+    statement = (
+        select(TimeEntry, Project)
+        .join(Project, Project.id == TimeEntry.project_id)  # type: ignore
+        .where(TimeEntry.id.in_(entry_ids), TimeEntry.user_id == current_user.id)  # type: ignore
+    )
+    loaded = {entry.id: (entry, project) for entry, project in session.exec(statement).all()}
+    
     # Verify all time entries exist, belong to user, and are unbilled
+    # (in request order, so the first bad id is the one reported)
     time_entries = []
-    for entry_id in invoice_data.time_entry_ids:
-        entry = session.get(TimeEntry, entry_id)
-        
-        if not entry or entry.user_id != current_user.id:
+    for entry_id in entry_ids:
+        if entry_id not in loaded:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Time entry {entry_id} not found"
             )
         
+        entry, project = loaded[entry_id]
+        
         if entry.is_invoiced:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -137,7 +123,7 @@ def generate_invoice(
                 detail=f"Time entry {entry_id} is not billable"
             )
         
-        time_entries.append(entry)
+        time_entries.append((entry, project))
     
     if not time_entries:
         raise HTTPException(
@@ -146,7 +132,7 @@ def generate_invoice(
         )
     
     # Generate invoice number
-    invoice_number = generate_invoice_number(session, current_user.id)
+    invoice_number = next_invoice_number(session, current_user.id)
     
     # Create invoice
     invoice = Invoice(
@@ -164,15 +150,12 @@ def generate_invoice(
     session.add(invoice)
     session.flush()  # Get invoice.id without committing
     
-    # Create line items and calculate subtotal
+    # Build line items and calculate subtotal
     subtotal = Decimal("0.00")
+    line_items = []
+    rollup_deltas = new_deltas()
     
-    for entry in time_entries:
-        # Get project for hourly rate
-        project = session.get(Project, entry.project_id)
-        if not project:
-            continue
-        
+    for entry, project in time_entries:
         # Calculate hours from seconds
         hours = Decimal(entry.duration_seconds or 0) / Decimal("3600")
         hours = hours.quantize(Decimal("0.01"))  # Round to 2 decimals
@@ -182,23 +165,42 @@ def generate_invoice(
         amount = hours * rate
         amount = amount.quantize(Decimal("0.01"))
         
-        # Create line item
-        line_item = InvoiceLineItem(
+        line_items.append(dict(
             invoice_id=invoice.id,
             time_entry_id=entry.id,
             description=f"{project.name}: {entry.description or 'Time entry'}",
             quantity=hours,
             rate=rate,
             amount=amount
-        )
-        
-        session.add(line_item)
+        ))
         subtotal += amount
         
-        # Mark time entry as invoiced
-        entry.is_invoiced = True
-        entry.invoice_id = invoice.id
-        session.add(entry)
+        add_entry(rollup_deltas, entry, -1)
+    
+    session.execute(insert(InvoiceLineItem), line_items)
+    
+    # Mark time entries as invoiced in one statement. The is_invoiced guard
+    # makes a concurrent invoice for the same entries lose cleanly.
+    result = session.execute(
+        update(TimeEntry)
+        .where(TimeEntry.id.in_(entry_ids), TimeEntry.is_invoiced == False)  # type: ignore
+        .values(is_invoiced=True, invoice_id=invoice.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(time_entries):  # type: ignore[attr-defined]
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Time entries were invoiced by another request"
+        )
+    
+    # Mirror the UPDATE on the loaded entries without marking them dirty
+    # (the ORM's own synchronization matches the IN list per object: O(n^2))
+    for entry, _ in time_entries:
+        set_committed_value(entry, "is_invoiced", True)
+        set_committed_value(entry, "invoice_id", invoice.id)
+        add_entry(rollup_deltas, entry)
+    apply_rollup_deltas(session, rollup_deltas)
     
     # Calculate totals
     subtotal = subtotal.quantize(Decimal("0.01"))
@@ -223,12 +225,15 @@ def generate_invoice(
 
 @router.get("/", status_code=status.HTTP_200_OK, response_model=List[InvoiceResponse])
 def get_invoices(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
     client_id: Optional[UUID] = None,
     status_filter: Optional[InvoiceStatus] = Query(None, alias="status"),
     limit: int = Query(100, le=500),
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None
 ):
     """
     Get all invoices for current user
@@ -237,27 +242,54 @@ def get_invoices(
     - client_id: Filter by client
     - status: Filter by status
     - limit: Max results
-    - offset: Pagination offset
+    - offset: Pagination offset (deprecated, use cursor)
+    - cursor: Opaque cursor from the X-Next-Cursor header of the previous page
     """
     
     # Base query
-    statement = select(Invoice).where(
+    conditions = [
         Invoice.user_id == current_user.id,
         Invoice.is_active == True
-    )
+    ]
     
     # Apply filters
     if client_id:
-        statement = statement.where(Invoice.client_id == client_id)
+        conditions.append(Invoice.client_id == client_id)
     
     if status_filter:
-        statement = statement.where(Invoice.status == status_filter)
+        conditions.append(Invoice.status == status_filter)
+    
+    # Skip the query entirely if the client's copy is current
+    etag = collection_etag(session, [(Invoice, conditions)], request.query_params)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
-    # Order and paginate
-    statement = statement.order_by(desc(Invoice.issue_date)).offset(offset).limit(limit)
+    statement = select(Invoice).where(*conditions)
+    
+    # Keyset pagination: seek past the last row of the previous page
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor, date)
+        statement = statement.where(
+            tuple_(Invoice.issue_date, Invoice.id) < tuple_(cursor_date, cursor_id)
+        )
+    elif offset:
+        statement = statement.offset(offset)
+    
+    # Order (id breaks ties between equal dates) and fetch one extra row
+    # to know whether another page exists
+    statement = statement.order_by(
+        desc(Invoice.issue_date), desc(Invoice.id)
+    ).limit(limit + 1)
     
     invoices = session.exec(statement).all()
     
+    next_cursor = None
+    if len(invoices) > limit:
+        invoices = invoices[:limit]
+        next_cursor = encode_cursor(invoices[-1].issue_date, invoices[-1].id)
+    set_next_cursor(response, next_cursor)
+    
     return invoices
 
 
@@ -268,6 +300,8 @@ def get_invoices(
 @router.get("/{invoice_id}", status_code=status.HTTP_200_OK, response_model=InvoiceWithDetails)
 def get_invoice(
     invoice_id: UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
@@ -281,6 +315,13 @@ def get_invoice(
             detail="Invoice not found"
         )
     
+    # Line items never change after generation, so invoice and client versions suffice
+    client = session.get(Client, invoice.client_id)
+    etag = make_etag(invoice.id, invoice.updated_at, client.updated_at if client else None)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
     return load_invoice_with_details(session, invoice_id)
 
 
@@ -366,10 +407,14 @@ def delete_invoice(
     statement = select(TimeEntry).where(TimeEntry.invoice_id == invoice_id)
     time_entries = session.exec(statement).all()
     
+    rollup_deltas = new_deltas()
     for entry in time_entries:
+        add_entry(rollup_deltas, entry, -1)
         entry.is_invoiced = False
         entry.invoice_id = None
+        add_entry(rollup_deltas, entry)
         session.add(entry)
+    apply_rollup_deltas(session, rollup_deltas)
     
     # Soft delete invoice
     invoice.is_active = False
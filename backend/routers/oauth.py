@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, Request, HTTPException
 from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session
 from db import get_session
 from auth import get_or_create_oauth_user, create_access_token
@@ -53,8 +54,9 @@ async def google_callback(request: Request, session: Session = Depends(get_sessi
         if not user_info.get('email_verified'):
             return RedirectResponse(f"{FRONTEND_URL}/auth/error?message=Unverified email")
         
-        # Get or create user
-        user = get_or_create_oauth_user(
+        # Get or create user (sync DB work, kept off the event loop)
+        user = await run_in_threadpool(
+            get_or_create_oauth_user,
             session=session,
             email=user_info['email'],
             name=user_info.get('name', user_info['email']),
@@ -128,8 +130,9 @@ async def github_callback(request: Request, session: Session = Depends(get_sessi
             else:
                 return RedirectResponse(f"{FRONTEND_URL}/auth/error?message=No verified email found")
         
-        # Get or create user
-        user = get_or_create_oauth_user(
+        # Get or create user (sync DB work, kept off the event loop)
+        user = await run_in_threadpool(
+            get_or_create_oauth_user,
             session=session,
             email=email,
             name=user_info.get('name') or user_info.get('login', email),
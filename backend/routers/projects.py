@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from typing import List, Optional
-from sqlmodel import Session, select, desc
+from sqlmodel import select, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import joinedload
 from uuid import UUID
+from datetime import date
 
-from db import get_session
+from db import get_async_session
 from models import (
     Project, User, Client, ProjectStatus
 )
 from auth import get_current_user
-from api_types import  ProjectCreate, ProjectUpdate, ProjectResponse, ProjectWithClient,ClientResponse
+from api_types import  ProjectCreate, ProjectUpdate, ProjectResponse, ProjectWithClient, ProjectWithBudget, ProjectBudget
+from budgets import get_project_consumption, build_budget, budget_version
+from etags import collection_etag, make_etag, not_modified
 
 router = APIRouter(prefix='/projects', tags=["Projects"])
 
@@ -16,9 +21,9 @@ router = APIRouter(prefix='/projects', tags=["Projects"])
 # CREATE PROJECT
 # ============================================
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=ProjectResponse)
-def create_project (
+async def create_project (
     project_data: ProjectCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -31,7 +36,7 @@ def create_project (
     
     # If client_id provided, verify it belongs to current user
     if project_data.client_id:
-        client = session.get(Client, project_data.client_id)
+        client = await session.get(Client, project_data.client_id)
         if not client or client.user_id != current_user.id or not client.is_active:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -45,8 +50,8 @@ def create_project (
     )
     
     session.add(new_project)
-    session.commit()
-    session.refresh(new_project)
+    await session.commit()
+    await session.refresh(new_project)
     
     return new_project
 
@@ -54,10 +59,12 @@ def create_project (
 # LIST ALL PROJECTS
 # ============================================
 
-@router.get("/", status_code=status.HTTP_200_OK, response_model=List[ProjectWithClient])
-def get_all_projects(
+@router.get("/", status_code=status.HTTP_200_OK, response_model=List[ProjectWithBudget])
+async def get_all_projects(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     status_filter: Optional[ProjectStatus] = None,
     client_id: Optional[UUID] = None,
     include_inactive: bool = False
@@ -84,23 +91,31 @@ def get_all_projects(
     if client_id:
         statement = statement.where(Project.client_id == client_id)
     
-    # Order by newest first
-    statement = statement.order_by(desc(Project.created_at))
+    # Budgets depend on the user's logged time (versioned as the rollups
+    # change, so no time entries are scanned) and on today's date
+    etag = await session.run_sync(collection_etag, [
+        (Project, [Project.user_id == current_user.id]),
+        (Client, [Client.user_id == current_user.id]),
+    ], budget_version(current_user.id), request.query_params, date.today())
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    # Order by newest first, loading clients in the same query
+    statement = statement.order_by(desc(Project.created_at)).options(
+        joinedload(Project.client)  # type: ignore
+    )
+    
+    projects = (await session.exec(statement)).all()
     
-    projects = session.exec(statement).all()
+    # Budget consumption for all listed projects (cached, one query for misses)
+    consumption = await session.run_sync(get_project_consumption, [project.id for project in projects])
     
-    # Load client relationships
     result = []
     for project in projects:
-        project_dict = ProjectWithClient.model_validate(project).model_dump()
-        
-        # Add client details if exists
-        if project.client_id:
-            client = session.get(Client, project.client_id)
-            if client:
-                project_dict['client'] = ClientResponse.model_validate(client).model_dump()
-        
-        result.append(project_dict)
+        project_with_budget = ProjectWithBudget.model_validate(project)
+        project_with_budget.budget = build_budget(project, consumption.get(project.id))
+        result.append(project_with_budget)
     
     return result
 
@@ -109,19 +124,60 @@ def get_all_projects(
 # ============================================
 
 @router.get("/{project_id}", status_code=status.HTTP_200_OK, response_model=ProjectWithClient)
-def get_project(
+async def get_project(
     project_id: UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Get a single project by ID"""
     
+    statement = select(Project).where(
+        Project.id == project_id,
+        Project.user_id == current_user.id,
+        Project.is_active == True
+    ).options(
+        joinedload(Project.client)  # type: ignore
+    )
+    project = (await session.exec(statement)).first()
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    etag = make_etag(project.id, project.updated_at, project.client.updated_at if project.client else None)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    return project
+
+# ============================================
+# PROJECT BUDGET
+# ============================================
+
+@router.get("/{project_id}/budget", status_code=status.HTTP_200_OK, response_model=ProjectBudget)
+async def get_project_budget(
+    project_id: UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Get budget consumption for a project
+    
+    Hours used, remaining and percent of budget_hours, plus the date the
+    budget runs out at the recent burn rate
+    """
+    
     statement = select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id,
         Project.is_active == True
     )
-    project = session.exec(statement).first()
+    project = (await session.exec(statement)).first()
     
     if not project:
         raise HTTPException(
@@ -129,25 +185,20 @@ def get_project(
             detail="Project not found"
         )
     
-    # Load client if exists
-    project_dict = ProjectWithClient.model_validate(project).model_dump()
-    if project.client_id:
-        client = session.get(Client, project.client_id)
-        if client:
-            project_dict['client'] = ClientResponse.model_validate(client).model_dump()
+    consumption = await session.run_sync(get_project_consumption, [project.id])
     
-    return project_dict
+    return build_budget(project, consumption.get(project.id))
 
 # ============================================
 # UPDATE PROJECT
 # ============================================
 
 @router.patch("/{project_id}", status_code=status.HTTP_200_OK, response_model=ProjectResponse)
-def update_project(
+async def update_project(
     project_id: UUID,
     project_data: ProjectUpdate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Update a project (partial update)"""
     
@@ -157,7 +208,7 @@ def update_project(
         Project.user_id == current_user.id,
         Project.is_active == True
     )
-    project = session.exec(statement).first()
+    project = (await session.exec(statement)).first()
     
     if not project:
         raise HTTPException(
@@ -167,7 +218,7 @@ def update_project(
     
     # If updating client_id, verify it belongs to user
     if project_data.client_id:
-        client = session.get(Client, project_data.client_id)
+        client = await session.get(Client, project_data.client_id)
         if not client or client.user_id != current_user.id or not client.is_active:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -180,8 +231,8 @@ def update_project(
         setattr(project, key, value)
     
     session.add(project)
-    session.commit()
-    session.refresh(project)
+    await session.commit()
+    await session.refresh(project)
     
     return project
 
@@ -191,10 +242,10 @@ def update_project(
 # ============================================
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(
+async def delete_project(
     project_id: UUID,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Soft delete a project"""
     
@@ -203,7 +254,7 @@ def delete_project(
         Project.user_id == current_user.id,
         Project.is_active == True
     )
-    project = session.exec(statement).first()
+    project = (await session.exec(statement)).first()
     
     if not project:
         raise HTTPException(
@@ -215,7 +266,7 @@ def delete_project(
     project.is_active = False
     
     session.add(project)
-    session.commit()
+    await session.commit()
     
 
 # ============================================
@@ -223,11 +274,11 @@ def delete_project(
 # ============================================
 
 @router.patch("/{project_id}/status", status_code=status.HTTP_200_OK, response_model=ProjectResponse)
-def update_project_status(
+async def update_project_status(
     project_id: UUID,
     project_status: ProjectStatus,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Update project status
@@ -241,7 +292,7 @@ def update_project_status(
         Project.user_id == current_user.id,
         Project.is_active == True
     )
-    project = session.exec(statement).first()
+    project = (await session.exec(statement)).first()
     
     if not project:
         raise HTTPException(
@@ -252,7 +303,7 @@ def update_project_status(
     project.status = project_status
     
     session.add(project)
-    session.commit()
-    session.refresh(project)
+    await session.commit()
+    await session.refresh(project)
     
     return project
\ No newline at end of file
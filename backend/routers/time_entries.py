@@ -1,17 +1,43 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Iterator, List, Optional
 from sqlmodel import Session, select, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import tuple_, insert, update, case, cast, func, or_, Date, DateTime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, aliased
 from uuid import UUID
 from datetime import datetime, timezone, date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+from pydantic import ValidationError
+import asyncio
+import csv
+import io
+import json
 
-from db import get_session
+from db import engine, get_session, get_async_session
+import n_plus_one
 from models import (
     TimeEntry, 
-    User, Project, Client
+    User, Project, Client, DailyRollup, time_entry_range
 )
 
-from api_types import TimeEntryCreate, TimeEntryManual, TimeEntryUpdate,TimeEntryResponse, TimeEntryWithProject, TimerStartRequest, TimerResponse,ClientResponse, ProjectWithClient
-from auth import get_current_user
+from api_types import TimeEntryCreate, TimeEntryManual, TimeEntryUpdate,TimeEntryResponse, TimeEntryWithProject, TimerStartRequest, TimerResponse
+from api_types import TimerStreamToken
+from api_types import TimeEntryImportRow, TimeEntryImportError, TimeEntryImportResult
+from api_types import TimeEntryOverlap
+from api_types import TimeSummaryGroupBy, TimeSummaryBucket, TimeSummaryResponse
+from api_types import TimeEntryFilter, TimeEntryBulkUpdate, TimeEntryBulkDelete, TimeEntryBulkSkipped, TimeEntryBulkResult
+from auth import get_current_user, get_stream_user, create_stream_token
+from config import STREAM_TOKEN_EXPIRE_SECONDS
+from events import get_broker, publish_timer_event
+from etags import collection_etag, make_etag, not_modified
+from pagination import encode_cursor, decode_cursor, set_next_cursor
+from rollups import (
+    new_deltas, add_contribution, entry_contribution, aggregate_contribution,
+    apply_rollup_deltas, apply_entry_change
+)
 
 router = APIRouter(prefix="/time-entries", tags=["Time Entries"])
 
@@ -29,14 +55,168 @@ def calculate_duration(start_time: datetime, end_time: Optional[datetime] = None
     return max(0, int(delta.total_seconds()))
 
 
+# ============================================
+# HELPER: Find Running Timer
+# ============================================
+
+def find_running_timer(session: Session, user_id: UUID) -> Optional[TimeEntry]:
+    """
+    Get the user's running timer, if any
+    
+    Matches the unique running-timer index exactly, so this is a single
+    index lookup no matter how many entries the user has
+    """
+    statement = select(TimeEntry).where(
+        TimeEntry.user_id == user_id,
+        TimeEntry.end_time == (None),
+        TimeEntry.is_active == True
+    )
+    return session.exec(statement).first()
+
+
+def timer_response(timer_entry: TimeEntry) -> TimerResponse:
+    """Running timer with its elapsed time so far"""
+    return TimerResponse(
+        id=timer_entry.id,
+        project_id=timer_entry.project_id,
+        description=timer_entry.description,
+        start_time=timer_entry.start_time,
+        elapsed_seconds=calculate_duration(timer_entry.start_time)
+    )
+
+
+def timer_payload(timer_entry: TimeEntry) -> dict:
+    """JSON-ready running timer, as pushed on the timer stream"""
+    return timer_response(timer_entry).model_dump(mode="json")
+
+
+def stopped_payload(entry: TimeEntry) -> dict:
+    """JSON-ready summary of a timer that has just stopped or been removed"""
+    return {
+        "id": str(entry.id),
+        "project_id": str(entry.project_id),
+        "end_time": entry.end_time.isoformat() if entry.end_time else None,
+        "duration_seconds": entry.duration_seconds,
+    }
+
+
+def publish_timer_change(user_id: UUID, timer_entry: TimeEntry) -> None:
+    """
+    Notify open timer streams of a change to the (until now) running timer
+    
+    Deleted or given an end time, it has stopped; otherwise it runs on with
+    a new project or description
+    """
+    if not timer_entry.is_active or timer_entry.end_time is not None:
+        publish_timer_event(user_id, "timer.stopped", stopped_payload(timer_entry))
+    else:
+        publish_timer_event(user_id, "timer.updated", timer_payload(timer_entry))
+
+
+# ============================================
+# HELPER: Overlap Detection
+# ============================================
+
+def overlaps_condition(entry, start_time, end_time, dialect_name: str):
+    """
+    SQL condition: `entry` (a TimeEntry or alias of it) overlaps [start_time, end_time)
+    
+    A missing end means a running timer, i.e. open-ended. On Postgres this
+    is a range && test that can use the GiST range index; elsewhere it is a
+    plain comparison that narrows by start_time via the (user_id, start_time)
+    index.
+    """
+    if dialect_name == "postgresql":
+        if isinstance(start_time, datetime):
+            # Type the bind values (a NULL end would otherwise be untyped)
+            column_type = TimeEntry.__table__.c.start_time.type  # type: ignore
+            start_time, end_time = cast(start_time, column_type), cast(end_time, column_type)
+        return time_entry_range(entry.start_time, entry.end_time).op("&&")(time_entry_range(start_time, end_time))
+    
+    ends_after_start = or_(entry.end_time == None, entry.end_time > start_time)
+    if end_time is None:
+        return ends_after_start
+    if isinstance(end_time, datetime):
+        return ends_after_start & (entry.start_time < end_time)
+    # A column (self-join): NULL there is a running timer too
+    return ends_after_start & or_(end_time == None, entry.start_time < end_time)
+
+
+def ensure_no_overlap(
+    session: Session,
+    user_id: UUID,
+    start_time: datetime,
+    end_time: Optional[datetime],
+    exclude_id: Optional[UUID] = None
+):
+    """Reject a time range that overlaps another active entry of the user"""
+    statement = select(TimeEntry).where(
+        TimeEntry.user_id == user_id,
+        TimeEntry.is_active == True,
+        overlaps_condition(TimeEntry, start_time, end_time, session.get_bind().dialect.name)
+    )
+    if exclude_id:
+        statement = statement.where(TimeEntry.id != exclude_id)
+    
+    other = session.exec(statement.limit(1)).first()
+    if other:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Time entry overlaps existing entry {other.id}"
+        )
+
+
+# ============================================
+# HELPER: Time Entry Filters
+# ============================================
+
+def time_entry_filters(
+    user_id: UUID,
+    project_id: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    is_billable: Optional[bool] = None,
+    is_invoiced: Optional[bool] = None
+) -> list:
+    """
+    Build the WHERE conditions for the user's active time entries
+    
+    Shared by the list endpoint and the set-based bulk operations so they
+    always select the same rows
+    """
+    conditions = [
+        TimeEntry.user_id == user_id,
+        TimeEntry.is_active == True
+    ]
+    
+    if project_id:
+        conditions.append(TimeEntry.project_id == project_id)
+    
+    if start_date:
+        start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc)
+        conditions.append(TimeEntry.start_time >= start_datetime)
+    
+    if end_date:
+        end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=timezone.utc)
+        conditions.append(TimeEntry.start_time <= end_datetime)
+    
+    if is_billable is not None:
+        conditions.append(TimeEntry.is_billable == is_billable)
+    
+    if is_invoiced is not None:
+        conditions.append(TimeEntry.is_invoiced == is_invoiced)
+    
+    return conditions
+
+
 # ============================================
 # TIMER: START
 # ============================================
 
 @router.post("/timer/start", status_code=status.HTTP_201_CREATED, response_model=TimeEntryResponse)
-def start_timer(
+async def start_timer(
     timer_data: TimerStartRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -47,27 +227,13 @@ def start_timer(
     """
     
     # Check if project exists and belongs to user
-    project = session.get(Project, timer_data.project_id)
+    project = await session.get(Project, timer_data.project_id)
     if not project or project.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    # Check if there's already a running timer
-    statement = select(TimeEntry).where(
-        TimeEntry.user_id == current_user.id,
-        TimeEntry.end_time == (None),
-        TimeEntry.is_active == True
-    )
-    running_timer = session.exec(statement).first()
-    
-    if running_timer:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Timer already running for project {running_timer.project_id}"
-        )
-    
     # Create timer entry (no end_time)
     timer_entry = TimeEntry(
         user_id=current_user.id,
@@ -78,9 +244,23 @@ def start_timer(
         duration_seconds=None
     )
     
+    # The unique running-timer index rejects a second timer, even when two
+    # starts race each other, so there is no need to check beforehand
     session.add(timer_entry)
-    session.commit()
-    session.refresh(timer_entry)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        running_timer = await session.run_sync(find_running_timer, current_user.id)
+        if not running_timer:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Timer already running for project {running_timer.project_id}"
+        )
+    await session.refresh(timer_entry)
+    
+    publish_timer_event(current_user.id, "timer.started", timer_payload(timer_entry))
     
     return timer_entry
 
@@ -90,8 +270,8 @@ def start_timer(
 # ============================================
 
 @router.patch("/timer/stop", status_code=status.HTTP_200_OK, response_model=TimeEntryResponse)
-def stop_timer(
-    session: Session = Depends(get_session),
+async def stop_timer(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -102,12 +282,7 @@ def stop_timer(
     """
     
     # Find running timer
-    statement = select(TimeEntry).where(
-        TimeEntry.user_id == current_user.id,
-        TimeEntry.end_time == (None),
-        TimeEntry.is_active == True
-    )
-    timer_entry = session.exec(statement).first()
+    timer_entry = await session.run_sync(find_running_timer, current_user.id)
     
     if not timer_entry:
         raise HTTPException(
@@ -121,8 +296,11 @@ def stop_timer(
     timer_entry.duration_seconds = calculate_duration(timer_entry.start_time, end_time)
     
     session.add(timer_entry)
-    session.commit()
-    session.refresh(timer_entry)
+    await session.run_sync(apply_entry_change, None, timer_entry)
+    await session.commit()
+    await session.refresh(timer_entry)
+    
+    publish_timer_event(current_user.id, "timer.stopped", stopped_payload(timer_entry))
     
     return timer_entry
 
@@ -132,8 +310,8 @@ def stop_timer(
 # ============================================
 
 @router.get("/timer/running", status_code=status.HTTP_200_OK, response_model=Optional[TimerResponse])
-def get_running_timer(
-    session: Session = Depends(get_session),
+async def get_running_timer(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -142,25 +320,78 @@ def get_running_timer(
     Returns null if no timer is running
     """
     
-    statement = select(TimeEntry).where(
-        TimeEntry.user_id == current_user.id,
-        TimeEntry.end_time == (None),
-        TimeEntry.is_active == True
-    )
-    timer_entry = session.exec(statement).first()
+    timer_entry = await session.run_sync(find_running_timer, current_user.id)
     
     if not timer_entry:
         return None
     
-    # Calculate elapsed time
-    elapsed = calculate_duration(timer_entry.start_time)
+    return timer_response(timer_entry)
+
+
+# ============================================
+# TIMER: STREAM (Server-Sent Events)
+# ============================================
+
+# Seconds between keep-alive comments on an idle stream
+TIMER_STREAM_KEEPALIVE = 15
+
+
+def format_sse(event_type: str, data) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/timer/stream-token", status_code=status.HTTP_200_OK, response_model=TimerStreamToken)
+async def create_timer_stream_token(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Issue a short-lived token for opening the timer stream
     
-    return TimerResponse(
-        id=timer_entry.id,
-        project_id=timer_entry.project_id,
-        description=timer_entry.description,
-        start_time=timer_entry.start_time,
-        elapsed_seconds=elapsed
+    - EventSource can't send an Authorization header: open
+      `/time-entries/timer/stream?token=...` with this instead
+    - Fetch a new one for every (re)connection
+    """
+    return TimerStreamToken(token=create_stream_token(current_user.id), expires_in=STREAM_TOKEN_EXPIRE_SECONDS)
+
+
+@router.get("/timer/stream", status_code=status.HTTP_200_OK)
+async def stream_timer_events(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_stream_user)
+):
+    """
+    Stream timer start/stop events for the current user (Server-Sent Events)
+    
+    - Authenticated by `?token=` from POST /time-entries/timer/stream-token
+    - Sends the current state first (`timer.state`, null if no timer runs)
+    - Then pushes `timer.started` / `timer.updated` / `timer.stopped` as
+      they happen, from any tab or device
+    - Idle streams cost no database queries
+    """
+    
+    user_id = current_user.id
+    timer_entry = await session.run_sync(find_running_timer, user_id)
+    initial_state = timer_payload(timer_entry) if timer_entry else None
+    
+    # Give the connection back to the pool; the stream itself never queries
+    await session.close()
+    
+    async def event_stream() -> AsyncIterator[str]:
+        async with get_broker().subscribe(user_id) as queue:  # type: ignore
+            yield format_sse("timer.state", initial_state)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=TIMER_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event["type"], event["data"])
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
@@ -169,9 +400,9 @@ def get_running_timer(
 # ============================================
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=TimeEntryResponse)
-def create_time_entry(
+async def create_time_entry(
     entry_data: TimeEntryCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -181,13 +412,15 @@ def create_time_entry(
     """
     
     # Verify project belongs to user
-    project = session.get(Project, entry_data.project_id)
+    project = await session.get(Project, entry_data.project_id)
     if not project or project.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
+    await session.run_sync(ensure_no_overlap, current_user.id, entry_data.start_time, entry_data.end_time)
+    
     # Calculate duration
     duration = calculate_duration(entry_data.start_time, entry_data.end_time)
     
@@ -203,8 +436,9 @@ def create_time_entry(
     )
     
     session.add(new_entry)
-    session.commit()
-    session.refresh(new_entry)
+    await session.run_sync(apply_entry_change, None, new_entry)
+    await session.commit()
+    await session.refresh(new_entry)
     
     return new_entry
 
@@ -214,9 +448,9 @@ def create_time_entry(
 # ============================================
 
 @router.post("/manual", status_code=status.HTTP_201_CREATED, response_model=TimeEntryResponse)
-def create_manual_entry(
+async def create_manual_entry(
     entry_data: TimeEntryManual,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -226,7 +460,7 @@ def create_manual_entry(
     """
     
     # Verify project
-    project = session.get(Project, entry_data.project_id)
+    project = await session.get(Project, entry_data.project_id)
     if not project or project.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -236,6 +470,8 @@ def create_manual_entry(
     # Calculate end time from duration
     end_time = entry_data.start_time + timedelta(seconds=entry_data.duration_seconds)
     
+    await session.run_sync(ensure_no_overlap, current_user.id, entry_data.start_time, end_time)
+    
     # Create entry
     new_entry = TimeEntry(
         user_id=current_user.id,
@@ -248,27 +484,200 @@ def create_manual_entry(
     )
     
     session.add(new_entry)
-    session.commit()
-    session.refresh(new_entry)
+    await session.run_sync(apply_entry_change, None, new_entry)
+    await session.commit()
+    await session.refresh(new_entry)
     
     return new_entry
 
 
+# ============================================
+# BULK IMPORT (CSV / NDJSON)
+# ============================================
+
+# Rows validated and inserted per round trip
+IMPORT_CHUNK_SIZE = 1000
+
+# Cap on row errors echoed back, so a bad file can't grow the response unbounded
+IMPORT_MAX_ERRORS = 1000
+
+
+def iter_import_rows(upload: UploadFile, import_format: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """
+    Stream rows out of an uploaded file without reading it into memory
+    
+    Yields (line number, row, parse error). CSV empty cells are treated
+    as missing values.
+    """
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    
+    if import_format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key and value != ""}, None
+    else:
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Could not parse row: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Row must be a JSON object"
+                continue
+            yield line_number, row, None
+
+
+@router.post("/import", status_code=status.HTTP_200_OK, response_model=TimeEntryImportResult)
+def import_time_entries(
+    file: UploadFile = File(...),
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Bulk import completed time entries from a CSV or NDJSON file
+    
+    - Columns/keys: project_id or project (name), start_time, end_time or
+      duration_seconds, description, is_billable
+    - format: csv or ndjson (inferred from the file name if omitted)
+    - Valid rows are inserted in chunks; invalid rows are reported by their
+      line number in the file
+    """
+    
+    # Work out the file format
+    if not import_format:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv"):
+            import_format = "csv"
+        elif filename.endswith((".ndjson", ".jsonl")):
+            import_format = "ndjson"
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Could not detect file format, pass format=csv or format=ndjson"
+            )
+    
+    # Resolve projects from memory instead of one lookup per row
+    projects = session.exec(
+        select(Project.id, Project.name).where(
+            Project.user_id == current_user.id,
+            Project.is_active == True
+        )
+    ).all()
+    project_ids = {project_id for project_id, _ in projects}
+    project_ids_by_name = {name.strip().lower(): project_id for project_id, name in projects}
+    
+    result = TimeEntryImportResult(imported=0, failed=0)
+    chunk: list[dict] = []
+    
+    def record_error(row_number: int, error: str):
+        result.failed += 1
+        if len(result.errors) < IMPORT_MAX_ERRORS:
+            result.errors.append(TimeEntryImportError(row=row_number, error=error))
+        else:
+            result.errors_truncated = True
+    
+    def flush_chunk():
+        if not chunk:
+            return
+        deltas = new_deltas()
+        for row in chunk:
+            add_contribution(
+                deltas, row["user_id"], row["project_id"], row["start_time"],
+                row["duration_seconds"], row["is_billable"], row["is_invoiced"]
+            )
+        # The same statements once per chunk, by design
+        with n_plus_one.suppress():
+            session.execute(insert(TimeEntry), chunk)
+            apply_rollup_deltas(session, deltas)
+            session.commit()
+        result.imported += len(chunk)
+        chunk.clear()
+    
+    rows = iter_import_rows(file, import_format)
+    row_number = 0
+    while True:
+        try:
+            row_number, raw_row, parse_error = next(rows)
+        except StopIteration:
+            break
+        except (UnicodeDecodeError, csv.Error) as e:
+            # The rest of the file can't be read reliably
+            record_error(row_number + 1, f"Could not read file: {e}")
+            break
+        
+        if parse_error or raw_row is None:
+            record_error(row_number, parse_error or "Could not parse row")
+            continue
+        
+        try:
+            row = TimeEntryImportRow.model_validate(raw_row)
+        except ValidationError as e:
+            record_error(row_number, "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc']) or 'row'}: {err['msg']}"
+                for err in e.errors()
+            ))
+            continue
+        
+        # Resolve project by id, falling back to name
+        if row.project_id:
+            project_id = row.project_id if row.project_id in project_ids else None
+        else:
+            project_id = project_ids_by_name.get((row.project or "").strip().lower())
+        if not project_id:
+            record_error(row_number, "Project not found")
+            continue
+        
+        # Fill in whichever of end_time / duration was not given
+        if row.end_time:
+            end_time = row.end_time
+            duration = calculate_duration(row.start_time, row.end_time)
+        else:
+            duration = row.duration_seconds or 0
+            end_time = row.start_time + timedelta(seconds=duration)
+        
+        chunk.append({
+            "id": uuid4(),
+            "user_id": current_user.id,
+            "project_id": project_id,
+            "description": row.description,
+            "start_time": row.start_time,
+            "end_time": end_time,
+            "duration_seconds": duration,
+            "is_billable": row.is_billable,
+            "is_invoiced": False,
+            "is_active": True,
+        })
+        
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            flush_chunk()
+    
+    flush_chunk()
+    
+    return result
+
+
 # ============================================
 # LIST TIME ENTRIES (With Advanced Filters)
 # ============================================
 
 @router.get("/", status_code=status.HTTP_200_OK, response_model=List[TimeEntryWithProject])
-def get_time_entries(
+async def get_time_entries(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     project_id: Optional[UUID] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     is_billable: Optional[bool] = None,
     is_invoiced: Optional[bool] = None,
     limit: int = Query(100, le=500),
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None
 ):
     """
     Get time entries with filters
@@ -280,60 +689,500 @@ def get_time_entries(
     - is_billable: Filter billable/non-billable
     - is_invoiced: Filter invoiced/uninvoiced
     - limit: Max results (default 100, max 500)
-    - offset: Pagination offset
+    - offset: Pagination offset (deprecated, use cursor)
+    - cursor: Opaque cursor from the X-Next-Cursor header of the previous page
     """
     
-    # Base query
-    statement = select(TimeEntry).where(
-        TimeEntry.user_id == current_user.id,
-        TimeEntry.is_active == True
+    conditions = time_entry_filters(
+        current_user.id,
+        project_id=project_id,
+        start_date=start_date,
+        end_date=end_date,
+        is_billable=is_billable,
+        is_invoiced=is_invoiced
     )
     
-    # Apply filters
-    if project_id:
-        statement = statement.where(TimeEntry.project_id == project_id)
+    # Skip the query entirely if the client's copy is current
+    etag = await session.run_sync(collection_etag, [
+        (TimeEntry, conditions),
+        (Project, [Project.user_id == current_user.id]),
+        (Client, [Client.user_id == current_user.id]),
+    ], request.query_params)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    # Base query with filters
+    statement = select(TimeEntry).where(*conditions)
+    
+    # Keyset pagination: seek past the last row of the previous page
+    if cursor:
+        cursor_start, cursor_id = decode_cursor(cursor, datetime)
+        statement = statement.where(
+            tuple_(TimeEntry.start_time, TimeEntry.id) < tuple_(cursor_start, cursor_id)
+        )
+    elif offset:
+        statement = statement.offset(offset)
+    
+    # Order (id breaks ties between equal start times) and fetch one extra row
+    # to know whether another page exists
+    statement = statement.order_by(
+        desc(TimeEntry.start_time), desc(TimeEntry.id)
+    ).limit(limit + 1)
+    
+    # Load project and client in the same query (avoids a lookup per row)
+    statement = statement.options(
+        joinedload(TimeEntry.project).joinedload(Project.client)  # type: ignore
+    )
+    
+    entries = (await session.exec(statement)).all()
+    
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1].start_time, entries[-1].id)
+    set_next_cursor(response, next_cursor)
+    
+    return entries
+
+
+# ============================================
+# EXPORT (Streaming CSV / NDJSON)
+# ============================================
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_COLUMNS = [
+    "id", "project_id", "project", "client", "description",
+    "start_time", "end_time", "duration_seconds",
+    "is_billable", "is_invoiced", "invoice_id",
+]
+
+
+def iter_export_rows(statement, export_format: str) -> Iterator[str]:
+    """
+    Render export rows as they stream out of the database
+    
+    Uses its own connection (the request session is closed once the
+    response starts streaming) and a server-side cursor, so memory stays
+    flat no matter how many rows are exported
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    if export_format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+    
+    with engine.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=EXPORT_BATCH_SIZE
+        ).execute(statement)
+        
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                values = [
+                    str(row.id), str(row.project_id), row.project, row.client, row.description,
+                    row.start_time.isoformat(), row.end_time.isoformat() if row.end_time else None,
+                    row.duration_seconds, row.is_billable, row.is_invoiced,
+                    str(row.invoice_id) if row.invoice_id else None,
+                ]
+                if export_format == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))) + "\n")
+            yield buffer.getvalue()
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+def export_time_entries(
+    current_user: User = Depends(get_current_user),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    project_id: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    is_billable: Optional[bool] = None,
+    is_invoiced: Optional[bool] = None
+):
+    """
+    Export time entries as CSV or NDJSON
+    
+    Takes the same filters as the list endpoint, without a row limit.
+    Project and client names are joined in SQL and rows are streamed,
+    oldest first.
+    """
+    
+    statement = (
+        select(
+            TimeEntry.id, TimeEntry.project_id,
+            Project.name.label("project"),  # type: ignore
+            Client.name.label("client"),  # type: ignore
+            TimeEntry.description, TimeEntry.start_time, TimeEntry.end_time,
+            TimeEntry.duration_seconds, TimeEntry.is_billable,
+            TimeEntry.is_invoiced, TimeEntry.invoice_id,
+        )
+        .join(Project, Project.id == TimeEntry.project_id)  # type: ignore
+        .outerjoin(Client, Client.id == Project.client_id)  # type: ignore
+        .where(*time_entry_filters(
+            current_user.id,
+            project_id=project_id,
+            start_date=start_date,
+            end_date=end_date,
+            is_billable=is_billable,
+            is_invoiced=is_invoiced
+        ))
+        .order_by(TimeEntry.start_time, TimeEntry.id)
+    )
+    
+    if export_format == "csv":
+        media_type, extension = "text/csv", "csv"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+    
+    return StreamingResponse(
+        iter_export_rows(statement, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=time-entries.{extension}"}
+    )
+
+
+# ============================================
+# SUMMARY (Totals by Period / Project / Client)
+# ============================================
+
+def period_start(column, group_by: TimeSummaryGroupBy, dialect_name: str):
+    """SQL expression truncating a timestamp to the start of its day, ISO week or month"""
+    if dialect_name == "sqlite":
+        if group_by == TimeSummaryGroupBy.DAY:
+            return func.date(column)
+        if group_by == TimeSummaryGroupBy.WEEK:
+            # Next Sunday (or today if Sunday), then back to that week's Monday
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime("%Y-%m-01", column)
+    
+    # date_trunc on a timestamptz (or a date, promoted to one) works in the
+    # session's TimeZone; buckets are UTC days like the rollups
+    if isinstance(column.type, Date):
+        column = cast(column, DateTime)
+    else:
+        column = func.timezone("UTC", column)
+    return cast(func.date_trunc(group_by.value, column), Date)
+
+
+@router.get("/summary", status_code=status.HTTP_200_OK, response_model=TimeSummaryResponse)
+def get_time_summary(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    group_by: TimeSummaryGroupBy = TimeSummaryGroupBy.DAY,
+    project_id: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    is_billable: Optional[bool] = None,
+    is_invoiced: Optional[bool] = None
+):
+    """
+    Get time totals grouped by day, week, month, project or client
+    
+    Takes the same filters as the list endpoint and covers completed
+    entries. Everything is computed in a single GROUP BY query; amounts
+    are billable hours × project rate. Without billable/invoiced filters
+    the daily rollup table is read instead of raw entries.
+    """
+    
+    dialect_name = session.get_bind().dialect.name
+    
+    if is_billable is None and is_invoiced is None:
+        # One row per project and day
+        billable_seconds = func.sum(DailyRollup.billable_seconds)
+        measures = [
+            func.sum(DailyRollup.entry_count).label("entry_count"),
+            func.sum(DailyRollup.total_seconds).label("total_seconds"),
+            billable_seconds.label("billable_seconds"),
+            (billable_seconds - func.sum(DailyRollup.invoiced_seconds)).label("unbilled_seconds"),
+            func.sum(DailyRollup.billable_seconds * Project.hourly_rate).label("billable_rate_seconds"),
+        ]
+        conditions = [DailyRollup.user_id == current_user.id]
+        if project_id:
+            conditions.append(DailyRollup.project_id == project_id)
+        if start_date:
+            conditions.append(DailyRollup.day >= start_date)
+        if end_date:
+            conditions.append(DailyRollup.day <= end_date)
+        source, source_project_id, source_time = DailyRollup, DailyRollup.project_id, DailyRollup.day
+    else:
+        seconds = func.coalesce(TimeEntry.duration_seconds, 0)
+        billable_case = case((TimeEntry.is_billable == True, seconds), else_=0)
+        unbilled_case = case(
+            ((TimeEntry.is_billable == True) & (TimeEntry.is_invoiced == False), seconds),
+            else_=0
+        )
+        measures = [
+            func.count(TimeEntry.id).label("entry_count"),  # type: ignore
+            func.sum(seconds).label("total_seconds"),
+            func.sum(billable_case).label("billable_seconds"),
+            func.sum(unbilled_case).label("unbilled_seconds"),
+            func.sum(billable_case * Project.hourly_rate).label("billable_rate_seconds"),
+        ]
+        conditions = time_entry_filters(
+            current_user.id,
+            project_id=project_id,
+            start_date=start_date,
+            end_date=end_date,
+            is_billable=is_billable,
+            is_invoiced=is_invoiced
+        )
+        conditions.append(TimeEntry.end_time != None)
+        source, source_project_id, source_time = TimeEntry, TimeEntry.project_id, TimeEntry.start_time
+    
+    # Bucket key and label
+    if group_by == TimeSummaryGroupBy.PROJECT:
+        group_columns = [source_project_id, Project.name]
+    elif group_by == TimeSummaryGroupBy.CLIENT:
+        group_columns = [Project.client_id, Client.name]
+    else:
+        bucket = period_start(source_time, group_by, dialect_name)
+        group_columns = [bucket.label("period")]
+    
+    statement = (
+        select(*group_columns, *measures)
+        .select_from(source)
+        .join(Project, Project.id == source_project_id)  # type: ignore
+        .where(*conditions)
+        .group_by(*group_columns)
+        .order_by(*group_columns)
+    )
+    if group_by == TimeSummaryGroupBy.CLIENT:
+        statement = statement.outerjoin(Client, Client.id == Project.client_id)  # type: ignore
+    
+    def to_amount(rate_seconds) -> Decimal:
+        return (Decimal(str(rate_seconds or 0)) / Decimal("3600")).quantize(Decimal("0.01"))
+    
+    buckets = []
+    for row in session.exec(statement).all():
+        if not row.entry_count:
+            # Rollup rows whose entries were all deleted
+            continue
+        
+        if group_by in (TimeSummaryGroupBy.PROJECT, TimeSummaryGroupBy.CLIENT):
+            key = str(row[0]) if row[0] else None
+            label = row[1] or "No client"
+        else:
+            key = label = str(row.period)
+        
+        buckets.append(TimeSummaryBucket(
+            key=key,
+            label=label,
+            entry_count=row.entry_count,
+            total_seconds=row.total_seconds or 0,
+            billable_seconds=row.billable_seconds or 0,
+            unbilled_seconds=row.unbilled_seconds or 0,
+            billable_amount=to_amount(row.billable_rate_seconds)
+        ))
+    
+    totals = TimeSummaryBucket(
+        label="Total",
+        entry_count=sum(b.entry_count for b in buckets),
+        total_seconds=sum(b.total_seconds for b in buckets),
+        billable_seconds=sum(b.billable_seconds for b in buckets),
+        unbilled_seconds=sum(b.unbilled_seconds for b in buckets),
+        billable_amount=sum((b.billable_amount for b in buckets), Decimal("0.00"))
+    )
+    
+    return TimeSummaryResponse(group_by=group_by, buckets=buckets, totals=totals)
+
+
+# ============================================
+# OVERLAPPING ENTRIES
+# ============================================
+
+@router.get("/overlaps", status_code=status.HTTP_200_OK, response_model=List[TimeEntryOverlap])
+def get_overlapping_entries(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    """
+    List every pair of overlapping time entries
+    
+    Query params:
+    - start_date / end_date: Only pairs whose earlier entry starts in this range
+    """
+    
+    first = aliased(TimeEntry)
+    second = aliased(TimeEntry)
+    dialect_name = session.get_bind().dialect.name
+    
+    # Self-join: `second` starts at or after `first` (ties broken by id) and
+    # before `first` ends, so every pair is reported once
+    statement = (
+        select(first, second)
+        .join(second, (second.user_id == first.user_id) & (second.is_active == True))
+        .where(
+            first.user_id == current_user.id,
+            first.is_active == True,
+            tuple_(first.start_time, first.id) < tuple_(second.start_time, second.id),
+            overlaps_condition(second, first.start_time, first.end_time, dialect_name)
+        )
+        .order_by(first.start_time, second.start_time)
+    )
     
     if start_date:
         start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc)
-        statement = statement.where(TimeEntry.start_time >= start_datetime)
+        statement = statement.where(first.start_time >= start_datetime)
     
     if end_date:
         end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=timezone.utc)
-        statement = statement.where(TimeEntry.start_time <= end_datetime)
+        statement = statement.where(first.start_time <= end_datetime)
     
-    if is_billable is not None:
-        statement = statement.where(TimeEntry.is_billable == is_billable)
+    now = datetime.now(timezone.utc)
     
-    if is_invoiced is not None:
-        statement = statement.where(TimeEntry.is_invoiced == is_invoiced)
+    def as_utc(value: Optional[datetime]) -> datetime:
+        if value is None:
+            return now
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
     
-    # Order and paginate
-    statement = statement.order_by(desc(TimeEntry.start_time)).offset(offset).limit(limit)
+    overlaps = []
+    for first_entry, second_entry in session.exec(statement).all():
+        overlap_start = max(as_utc(first_entry.start_time), as_utc(second_entry.start_time))
+        overlap_end = min(as_utc(first_entry.end_time), as_utc(second_entry.end_time))
+        overlaps.append(TimeEntryOverlap(
+            first=TimeEntryResponse.model_validate(first_entry),
+            second=TimeEntryResponse.model_validate(second_entry),
+            overlap_seconds=max(0, int((overlap_end - overlap_start).total_seconds()))
+        ))
     
-    entries = session.exec(statement).all()
+    return overlaps
+
+
+# ============================================
+# BULK UPDATE / DELETE
+# ============================================
+
+def apply_bulk_change(
+    session: Session,
+    user_id: UUID,
+    ids: Optional[List[UUID]],
+    filters: Optional[TimeEntryFilter],
+    values: dict
+) -> TimeEntryBulkResult:
+    """
+    Apply `values` to the selected entries with one set-based UPDATE
     
-    # Load relationships
-    result = []
-    for entry in entries:
-        entry_dict = TimeEntryWithProject.model_validate(entry).model_dump()
-        
-        # Load project with client
-        if entry.project_id:
-            project = session.get(Project, entry.project_id)
-            if project:
-                project_dict = ProjectWithClient.model_validate(project).model_dump()
-                
-                # Load client if exists
-                if project.client_id:
-                    client = session.get(Client, project.client_id)
-                    if client:
-                        project_dict['client'] = ClientResponse.model_validate(client).model_dump()
-                
-                entry_dict['project'] = project_dict
-        
-        result.append(entry_dict)
+    Invoiced entries are never touched; they (and, for id lists, ids that
+    don't match an active entry of the user) are reported as skipped
+    """
+    conditions = time_entry_filters(user_id, **(filters.model_dump() if filters else {}))
+    if ids is not None:
+        conditions.append(TimeEntry.id.in_(ids))  # type: ignore
     
-    return result
+    # Rollup share of the rows about to change, and what it becomes afterwards
+    # (invoiced rows are excluded, so invoiced seconds are always zero here)
+    rollup_before = aggregate_contribution(session, [*conditions, TimeEntry.is_invoiced == False])
+    rollup_deltas = new_deltas()
+    for (row_user_id, row_project_id, day), (count, total, billable, _) in rollup_before.items():
+        old_totals = rollup_deltas[(row_user_id, row_project_id, day)]
+        old_totals[0] -= count
+        old_totals[1] -= total
+        old_totals[2] -= billable
+        if values.get("is_active", True):
+            if "is_billable" in values:
+                billable = total if values["is_billable"] else 0
+            new_totals = rollup_deltas[(row_user_id, values.get("project_id") or row_project_id, day)]
+            new_totals[0] += count
+            new_totals[1] += total
+            new_totals[2] += billable
+    
+    # The running timer, if selected, so open timer streams can be told
+    running_timer = session.exec(
+        select(TimeEntry).where(*conditions, TimeEntry.is_invoiced == False, TimeEntry.end_time == None)
+    ).first()
+    
+    statement = (
+        update(TimeEntry)
+        .where(*conditions, TimeEntry.is_invoiced == False)
+        .values(**values)
+        .returning(TimeEntry.id)
+        .execution_options(synchronize_session=False)
+    )
+    updated_ids = set(session.exec(statement).scalars().all())  # type: ignore
+    
+    # Matching entries that were left alone because they are invoiced
+    invoiced_ids = session.exec(
+        select(TimeEntry.id).where(*conditions, TimeEntry.is_invoiced == True)
+    ).all()
+    
+    apply_rollup_deltas(session, rollup_deltas)
+    session.commit()
+    
+    if running_timer is not None:
+        session.refresh(running_timer)
+        publish_timer_change(user_id, running_timer)
+    
+    skipped = [
+        TimeEntryBulkSkipped(id=entry_id, reason="Cannot modify invoiced time entries")
+        for entry_id in invoiced_ids
+    ]
+    if ids is not None:
+        seen = updated_ids.union(invoiced_ids)
+        skipped.extend(
+            TimeEntryBulkSkipped(id=entry_id, reason="Time entry not found")
+            for entry_id in dict.fromkeys(ids) if entry_id not in seen
+        )
+    
+    return TimeEntryBulkResult(affected=len(updated_ids), skipped=skipped)
+
+
+@router.patch("/bulk", status_code=status.HTTP_200_OK, response_model=TimeEntryBulkResult)
+def bulk_update_time_entries(
+    bulk_data: TimeEntryBulkUpdate,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update many time entries at once
+    
+    - Select entries by `ids` or by `filters` (same filters as listing)
+    - Can change project_id, description and is_billable
+    - Invoiced entries are skipped and reported
+    """
+    
+    values = bulk_data.model_dump(include={"project_id", "description", "is_billable"}, exclude_unset=True)
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    
+    # Verify project if being changed
+    if bulk_data.project_id:
+        project = session.get(Project, bulk_data.project_id)
+        if not project or project.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+    
+    return apply_bulk_change(session, current_user.id, bulk_data.ids, bulk_data.filters, values)
+
+
+@router.delete("/bulk", status_code=status.HTTP_200_OK, response_model=TimeEntryBulkResult)
+def bulk_delete_time_entries(
+    bulk_data: TimeEntryBulkDelete,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Soft delete many time entries at once
+    
+    - Select entries by `ids` or by `filters` (same filters as listing)
+    - Invoiced entries are skipped and reported
+    """
+    
+    return apply_bulk_change(session, current_user.id, bulk_data.ids, bulk_data.filters, {"is_active": False})
 
 
 # ============================================
@@ -341,10 +1190,12 @@ def get_time_entries(
 # ============================================
 
 @router.get("/{entry_id}", status_code=status.HTTP_200_OK, response_model=TimeEntryWithProject)
-def get_time_entry(
+async def get_time_entry(
     entry_id: UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Get a single time entry by ID"""
     
@@ -352,8 +1203,10 @@ def get_time_entry(
         TimeEntry.id == entry_id,
         TimeEntry.user_id == current_user.id,
         TimeEntry.is_active == True
+    ).options(
+        joinedload(TimeEntry.project).joinedload(Project.client)  # type: ignore
     )
-    entry = session.exec(statement).first()
+    entry = (await session.exec(statement)).first()
     
     if not entry:
         raise HTTPException(
@@ -361,19 +1214,18 @@ def get_time_entry(
             detail="Time entry not found"
         )
     
-    # Load project
-    entry_dict = TimeEntryWithProject.model_validate(entry).model_dump()
-    if entry.project_id:
-        project = session.get(Project, entry.project_id)
-        if project:
-            project_dict = ProjectWithClient.model_validate(project).model_dump()
-            if project.client_id:
-                client = session.get(Client, project.client_id)
-                if client:
-                    project_dict['client'] = ClientResponse.model_validate(client).model_dump()
-            entry_dict['project'] = project_dict
+    project = entry.project
+    client = project.client if project else None
+    etag = make_etag(
+        entry.id, entry.updated_at,
+        project.updated_at if project else None,
+        client.updated_at if client else None
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
-    return entry_dict
+    return entry
 
 
 # ============================================
@@ -381,11 +1233,11 @@ def get_time_entry(
 # ============================================
 
 @router.patch("/{entry_id}", status_code=status.HTTP_200_OK, response_model=TimeEntryResponse)
-def update_time_entry(
+async def update_time_entry(
     entry_id: UUID,
     entry_data: TimeEntryUpdate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Update a time entry (cannot update if already invoiced)"""
     
@@ -395,7 +1247,7 @@ def update_time_entry(
         TimeEntry.user_id == current_user.id,
         TimeEntry.is_active == True
     )
-    entry = session.exec(statement).first()
+    entry = (await session.exec(statement)).first()
     
     if not entry:
         raise HTTPException(
@@ -412,15 +1264,29 @@ def update_time_entry(
     
     # Verify project if being changed
     if entry_data.project_id:
-        project = session.get(Project, entry_data.project_id)
+        project = await session.get(Project, entry_data.project_id)
         if not project or project.user_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
     
-    # Update fields
     update_data = entry_data.model_dump(exclude_unset=True)
+    
+    # Check the new time range if it changes
+    if "start_time" in update_data or "end_time" in update_data:
+        new_start = update_data.get("start_time") or entry.start_time
+        new_end = update_data["end_time"] if "end_time" in update_data else entry.end_time
+        if new_end is not None and new_end <= new_start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="End time must be after start time"
+            )
+        await session.run_sync(ensure_no_overlap, current_user.id, new_start, new_end, exclude_id=entry.id)
+    
+    # Update fields
+    rollup_before = entry_contribution(entry)
+    was_running = entry.end_time is None
     for key, value in update_data.items():
         setattr(entry, key, value)
     
@@ -429,8 +1295,12 @@ def update_time_entry(
         entry.duration_seconds = calculate_duration(entry.start_time, entry.end_time)
     
     session.add(entry)
-    session.commit()
-    session.refresh(entry)
+    await session.run_sync(apply_entry_change, rollup_before, entry)
+    await session.commit()
+    await session.refresh(entry)
+    
+    if was_running:
+        publish_timer_change(current_user.id, entry)
     
     return entry
 
@@ -440,10 +1310,10 @@ def update_time_entry(
 # ============================================
 
 @router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_time_entry(
+async def delete_time_entry(
     entry_id: UUID,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Soft delete a time entry (cannot delete if invoiced)"""
     
@@ -452,7 +1322,7 @@ def delete_time_entry(
         TimeEntry.user_id == current_user.id,
         TimeEntry.is_active == True
     )
-    entry = session.exec(statement).first()
+    entry = (await session.exec(statement)).first()
     
     if not entry:
         raise HTTPException(
@@ -468,7 +1338,13 @@ def delete_time_entry(
         )
     
     # Soft delete
+    rollup_before = entry_contribution(entry)
     entry.is_active = False
     
     session.add(entry)
-    session.commit()
\ No newline at end of file
+    await session.run_sync(apply_entry_change, rollup_before, entry)
+    await session.commit()
+    
+    # Deleting a running timer stops it for every open tab
+    if entry.end_time is None:
+        publish_timer_event(current_user.id, "timer.stopped", stopped_payload(entry))
\ No newline at end of file
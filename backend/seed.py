@@ -1,22 +1,38 @@
-import sys
+import argparse
+import csv
+import io
+import itertools
+import math
 import random
+import sys
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone, date
 from decimal import Decimal
-from sqlmodel import Session, select
-from db import engine  # Assuming your db.py exports 'engine'
-from models import User, Client, Project, TimeEntry, Invoice, InvoiceLineItem, ProjectStatus, InvoiceStatus
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, select
+from db import engine, create_db_and_tables
+import n_plus_one
+from models import User, Client, Project, TimeEntry, Invoice, InvoiceCounter, InvoiceLineItem, ProjectStatus, InvoiceStatus
+from invoice_numbers import format_invoice_number, next_invoice_number
+from rollups import RollupDeltas, add_contribution, apply_rollup_deltas, new_deltas, rebuild_rollups
+
 
-# --- CONFIGURATION ---
-TARGET_EMAIL = input("Enter the email of the account you want to seed: ").strip()
+# ============================================
+# DEMO DATA (one existing account)
+# ============================================
 
-def create_dummy_data():
+def create_dummy_data(target_email: str):
     with Session(engine) as session:
         # 1. Get the User
-        statement = select(User).where(User.email == TARGET_EMAIL)
+        statement = select(User).where(User.email == target_email)
         user = session.exec(statement).first()
 
         if not user:
-            print(f"❌ Error: User with email '{TARGET_EMAIL}' not found.")
+            print(f"❌ Error: User with email '{target_email}' not found.")
             return
 
         print(f"✅ Found user: {user.first_name} {user.last_name} ({user.id})")
@@ -30,8 +46,7 @@ def create_dummy_data():
         ]
         for c in clients:
             session.add(c)
-        session.commit()
-        for c in clients: session.refresh(c)
+        session.flush()
         print(f"   - Created {len(clients)} clients")
 
         # 3. Create Projects
@@ -44,8 +59,7 @@ def create_dummy_data():
         ]
         for p in projects:
             session.add(p)
-        session.commit()
-        for p in projects: session.refresh(p)
+        session.flush()
         print(f"   - Created {len(projects)} projects")
 
         # 4. Create Time Entries (Last 30 days)
@@ -77,9 +91,7 @@ def create_dummy_data():
             time_entries.append(entry)
             session.add(entry)
             
-        session.commit()
-        # Refresh to get IDs
-        for t in time_entries: session.refresh(t)
+        session.flush()
         print(f"   - Created {len(time_entries)} time entries")
 
         # 5. Create Invoices (One Paid, One Draft)
@@ -92,7 +104,7 @@ def create_dummy_data():
         invoice1 = Invoice(
             user_id=user.id,
             client_id=clients[0].id,
-            invoice_number="INV-001",
+            invoice_number=next_invoice_number(session, user.id),
             status=InvoiceStatus.PAID,
             issue_date=date.today() - timedelta(days=10),
             due_date=date.today() + timedelta(days=20),
@@ -123,7 +135,7 @@ def create_dummy_data():
         invoice2 = Invoice(
             user_id=user.id,
             client_id=clients[1].id,
-            invoice_number="INV-002",
+            invoice_number=next_invoice_number(session, user.id),
             status=InvoiceStatus.DRAFT,
             issue_date=date.today(),
             due_date=date.today() + timedelta(days=30),
@@ -134,7 +146,326 @@ def create_dummy_data():
 
         session.commit()
         print(f"   - Created 2 Invoices (1 Paid, 1 Draft)")
+
+        # Entries were inserted directly, so derive their daily rollups
+        rebuild_rollups(session, user.id)
         print("\n✨ Database seeded successfully! Restart your frontend to see the data.")
 
+
+
+# ============================================
+# PERFORMANCE DATASETS (bulk generator)
+# ============================================
+#
+# users x clients x projects x entries x invoices, written in chunks: COPY on
+# Postgres (psycopg2), multi-row INSERT elsewhere. Ids are generated up front
+# so no row is ever refreshed or read back, and the daily rollups are
+# accumulated alongside and upserted with each chunk.
+
+DEFAULT_PASSWORD = "password123"
+
+HOURLY_RATES = [Decimal(rate) for rate in ("50.00", "75.00", "90.00", "100.00", "120.00", "150.00", "200.00")]
+BUDGET_HOURS = [None, None, Decimal("40"), Decimal("80"), Decimal("160"), Decimal("320")]
+PROJECT_COLORS = ["#3B82F6", "#EF4444", "#F59E0B", "#10B981", "#8B5CF6", "#EC4899", "#6B7280"]
+TASKS = ["Development", "Code review", "Meetings", "Design", "Testing", "Deployment", "Research", "Support", "Planning"]
+
+# Per-user entry counts are lognormal around the requested mean: most users
+# near it, a long tail of heavy users
+ENTRY_COUNT_SIGMA = 0.75
+# Entry lengths (minutes): lognormal, clipped to a sane range
+DURATION_MEDIAN_MINUTES = 50
+DURATION_SIGMA = 0.8
+DURATION_RANGE = (5, 240)
+# Entries are laid back-to-back inside working hours (UTC), so they never overlap
+WORKDAY_HOURS = (8, 19)
+GAPS_MINUTES = [0, 0, 0, 5, 10, 15, 30, 60]
+
+BILLABLE_RATIO = 0.9
+TAX_RATES = [Decimal("0.0000"), Decimal("0.0000"), Decimal("0.0800"), Decimal("0.2000")]
+
+
+def _uuid(rng: random.Random) -> UUID:
+    """Random (but seed-reproducible) v4 UUID"""
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def _around(rng: random.Random, mean: float) -> int:
+    """Count near `mean`, at least 1"""
+    return max(1, round(rng.gauss(mean, mean / 3)))
+
+
+def _copy_value(value):
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (ProjectStatus, InvoiceStatus)):
+        # Enum columns store member names
+        return value.name
+    return value  # None is written as an empty (NULL) field
+
+
+def copy_rows(session: Session, model: type[SQLModel], rows: list[dict]) -> None:
+    """COPY rows into the model's table (Postgres + psycopg2 only)"""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    cursor = session.connection().connection.cursor()
+    cursor.copy_expert(f'COPY "{model.__tablename__}" ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+class BulkWriter:
+    """
+    Buffers generated rows and writes them once `chunk_size` are pending
+
+    Tables are written parents first, so a chunk never references a row
+    that isn't already written.
+    """
+
+    TABLE_ORDER = [User, InvoiceCounter, Client, Project, Invoice, TimeEntry, InvoiceLineItem]
+
+    def __init__(self, session: Session, chunk_size: int):
+        self.session = session
+        self.chunk_size = chunk_size
+        bind = session.get_bind()
+        self.use_copy = bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+        self.rows: dict[type[SQLModel], list[dict]] = {model: [] for model in self.TABLE_ORDER}
+        self.pending = 0
+        self.rollups: RollupDeltas = new_deltas()
+        self.written: dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+
+    def add(self, model: type[SQLModel], row: dict) -> None:
+        self.rows[model].append(row)
+        self.pending += 1
+        if self.pending >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        # One round of the same inserts per chunk (not an N+1 if run in a request)
+        with n_plus_one.suppress():
+            for model in self.TABLE_ORDER:
+                rows = self.rows[model]
+                if not rows:
+                    continue
+                if self.use_copy:
+                    copy_rows(self.session, model, rows)
+                else:
+                    # Core insert on the table: one executemany, skipping the ORM bulk path
+                    self.session.connection().execute(insert(model.__table__), rows)  # type: ignore[attr-defined]
+                self.written[model.__tablename__] += len(rows)
+                rows.clear()
+            apply_rollup_deltas(self.session, self.rollups)
+            self.session.commit()
+        self.rollups = new_deltas()
+        self.pending = 0
+
+        elapsed = time.perf_counter() - self.started
+        entries = self.written[TimeEntry.__tablename__]
+        print(f"   - {entries:,} entries written ({entries / elapsed:,.0f}/s)")
+
+
+def _previous_workday(day: date, rng: random.Random) -> date:
+    """The working day before `day` (weekends are worked 5% of the time)"""
+    day -= timedelta(days=1)
+    while day.weekday() >= 5 and rng.random() > 0.05:
+        day -= timedelta(days=1)
+    return day
+
+
+def _entry_slots(rng: random.Random, count: int, today: date):
+    """(start, minutes) for `count` non-overlapping entries, walking back from yesterday"""
+    day = _previous_workday(today, rng)
+    cursor = datetime(day.year, day.month, day.day, WORKDAY_HOURS[1], tzinfo=timezone.utc)
+    for _ in range(count):
+        minutes = round(rng.lognormvariate(math.log(DURATION_MEDIAN_MINUTES), DURATION_SIGMA))
+        minutes = min(max(minutes, DURATION_RANGE[0]), DURATION_RANGE[1])
+        start = cursor - timedelta(minutes=rng.choice(GAPS_MINUTES) + minutes)
+        if start.hour < WORKDAY_HOURS[0] or start.date() != day:
+            day = _previous_workday(day, rng)
+            cursor = datetime(day.year, day.month, day.day, WORKDAY_HOURS[1], tzinfo=timezone.utc)
+            start = cursor - timedelta(minutes=minutes)
+        cursor = start
+        yield start, minutes
+
+
+def _invoice_status(rng: random.Random, due_date: date, today: date) -> InvoiceStatus:
+    if due_date >= today:
+        return rng.choice([InvoiceStatus.DRAFT, InvoiceStatus.SENT])
+    return InvoiceStatus.PAID if rng.random() < 0.9 else InvoiceStatus.OVERDUE
+
+
+def generate_user(
+    writer: BulkWriter,
+    rng: random.Random,
+    index: int,
+    email_prefix: str,
+    hashed_password: str,
+    clients: int,
+    projects: int,
+    entries: int,
+    invoices: int
+) -> None:
+    """One account with its clients, projects, entries and invoices"""
+    today = date.today()
+    user_id = _uuid(rng)
+    writer.add(User, dict(
+        id=user_id, email=f"{email_prefix}-{index:06d}@example.com",
+        first_name="Perf", last_name=f"User {index}", hashed_password=hashed_password,
+        oauth_provider=None, oauth_id=None, avatar_url=None,
+    ))
+
+    # Clients, each with a few projects; half the users also track internal work
+    user_projects = []
+    for c in range(_around(rng, clients)):
+        client_id = _uuid(rng)
+        writer.add(Client, dict(
+            id=client_id, user_id=user_id, email=f"billing@client{c}.example.com",
+            name=f"Client {c}", company=f"Client {c} Ltd.", is_active=rng.random() < 0.9, notes=None,
+        ))
+        for p in range(_around(rng, projects)):
+            user_projects.append(dict(
+                id=_uuid(rng), user_id=user_id, client_id=client_id, name=f"Project {c}.{p}",
+                description=None, hourly_rate=rng.choice(HOURLY_RATES), currency="USD",
+                budget_hours=rng.choice(BUDGET_HOURS),
+                status=rng.choices(list(ProjectStatus), weights=[75, 20, 5])[0],
+                color=rng.choice(PROJECT_COLORS), is_active=True,
+            ))
+    if rng.random() < 0.5:
+        user_projects.append(dict(
+            id=_uuid(rng), user_id=user_id, client_id=None, name="Internal", description=None,
+            hourly_rate=Decimal("0.00"), currency="USD", budget_hours=None,
+            status=ProjectStatus.ACTIVE, color="#6B7280", is_active=True,
+        ))
+    for project in user_projects:
+        writer.add(Project, project)
+
+    # Time goes mostly to a few projects (Zipf-like popularity)
+    rng.shuffle(user_projects)
+    popularity = list(itertools.accumulate(1 / rank for rank in range(1, len(user_projects) + 1)))
+
+    mu = math.log(entries) - ENTRY_COUNT_SIGMA ** 2 / 2  # lognormal with mean `entries`
+    count = min(round(rng.lognormvariate(mu, ENTRY_COUNT_SIGMA)), entries * 20)
+    user_entries = []
+    for start, minutes in _entry_slots(rng, count, today):
+        project = rng.choices(user_projects, cum_weights=popularity)[0]
+        user_entries.append(dict(
+            id=_uuid(rng), user_id=user_id, project_id=project["id"], invoice_id=None,
+            start_time=start, end_time=start + timedelta(minutes=minutes), duration_seconds=minutes * 60,
+            description=rng.choice(TASKS),
+            is_billable=project["client_id"] is not None and project["hourly_rate"] > 0 and rng.random() < BILLABLE_RATIO,
+            is_invoiced=False, is_active=True,
+        ))
+
+    # Invoice the most recent finished months, one invoice per client and month
+    this_month = today.replace(day=1)
+    projects_by_id = {project["id"]: project for project in user_projects}
+    months: dict[tuple[UUID, date], list[dict]] = defaultdict(list)
+    for entry in user_entries:
+        month = entry["start_time"].date().replace(day=1)
+        if entry["is_billable"] and month < this_month:
+            months[(projects_by_id[entry["project_id"]]["client_id"], month)].append(entry)
+    invoiced = sorted(months, key=lambda key: key[1])[-invoices:] if invoices else []
+
+    line_items = []
+    for number, (client_id, month) in enumerate(invoiced, start=1):
+        invoice_id = _uuid(rng)
+        issue_date = (month + timedelta(days=32)).replace(day=1)
+        due_date = issue_date + timedelta(days=30)
+        subtotal = Decimal("0.00")
+        for entry in months[(client_id, month)]:
+            project = projects_by_id[entry["project_id"]]
+            hours = (Decimal(entry["duration_seconds"]) / Decimal("3600")).quantize(Decimal("0.01"))
+            amount = (hours * project["hourly_rate"]).quantize(Decimal("0.01"))
+            subtotal += amount
+            entry["is_invoiced"] = True
+            entry["invoice_id"] = invoice_id
+            line_items.append(dict(
+                id=_uuid(rng), invoice_id=invoice_id, time_entry_id=entry["id"],
+                description=f"{project['name']}: {entry['description']}",
+                quantity=hours, rate=project["hourly_rate"], amount=amount,
+            ))
+        tax_rate = rng.choice(TAX_RATES)
+        tax_amount = (subtotal * tax_rate).quantize(Decimal("0.01"))
+        writer.add(Invoice, dict(
+            id=invoice_id, user_id=user_id, client_id=client_id,
+            invoice_number=format_invoice_number(number),
+            status=_invoice_status(rng, due_date, today), issue_date=issue_date, due_date=due_date,
+            subtotal=subtotal, tax_rate=tax_rate, tax_amount=tax_amount, total=subtotal + tax_amount,
+            notes=None, payment_terms="Net 30", is_active=True,
+        ))
+
+    writer.add(InvoiceCounter, dict(user_id=user_id, last_number=len(invoiced)))
+
+    for entry in user_entries:
+        add_contribution(
+            writer.rollups, user_id, entry["project_id"], entry["start_time"],
+            entry["duration_seconds"], entry["is_billable"], entry["is_invoiced"]
+        )
+        writer.add(TimeEntry, entry)
+    for line_item in line_items:
+        writer.add(InvoiceLineItem, line_item)
+
+
+def generate_dataset(
+    users: int,
+    clients: int = 3,
+    projects: int = 2,
+    entries: int = 1000,
+    invoices: int = 6,
+    chunk_size: int = 50_000,
+    seed: Optional[int] = None,
+    email_prefix: str = "perf",
+    password: str = DEFAULT_PASSWORD
+) -> dict[str, int]:
+    """
+    Bulk-generate a benchmark dataset; counts are means per parent row
+
+    Returns rows written per table. The same seed produces the same dataset.
+    """
+    from auth import hash_password
+
+    rng = random.Random(seed)
+    # One bcrypt hash shared by every account, so they can all log in
+    hashed_password = hash_password(password)
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        writer = BulkWriter(session, chunk_size)
+        for index in range(users):
+            generate_user(writer, rng, index, email_prefix, hashed_password, clients, projects, entries, invoices)
+        writer.flush()
+    return dict(writer.written)
+
+
 if __name__ == "__main__":
-    create_dummy_data()
\ No newline at end of file
+    if len(sys.argv) == 1:
+        # Demo data for one existing account
+        target_email = input("Enter the email of the account you want to seed: ").strip()
+        create_dummy_data(target_email)
+        sys.exit()
+
+    parser = argparse.ArgumentParser(description="Generate a performance dataset (python seed.py with no arguments seeds demo data)")
+    parser.add_argument("--users", type=int, required=True)
+    parser.add_argument("--clients", type=int, default=3, help="Mean clients per user")
+    parser.add_argument("--projects", type=int, default=2, help="Mean projects per client")
+    parser.add_argument("--entries", type=int, default=1000, help="Mean time entries per user")
+    parser.add_argument("--invoices", type=int, default=6, help="Invoiced months per user")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per COPY / INSERT batch")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed, for reproducible datasets")
+    parser.add_argument("--email-prefix", default="perf", help="Accounts are <prefix>-000000@example.com, ...")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of every generated account")
+    args = parser.parse_args()
+
+    print(f"🌱 Generating {args.users:,} users x ~{args.entries:,} entries...")
+    start = time.perf_counter()
+    written = generate_dataset(
+        args.users, args.clients, args.projects, args.entries, args.invoices,
+        args.chunk_size, args.seed, args.email_prefix, args.password
+    )
+    for table, count in written.items():
+        print(f"   - {table}: {count:,} rows")
+    print(f"\n✨ Done in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,40 @@
+import time
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from metrics import record_serialization
+
+
+# ============================================
+# ORJSON RESPONSE CLASS
+# ============================================
+
+def encode_default(value: Any) -> Any:
+    """Types orjson can't encode natively (UUID, datetime and date are native)"""
+    if isinstance(value, Decimal):
+        # Strings, like pydantic, so amounts never lose precision
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Default response class: renders already-serialized content with orjson
+
+    OPT_UTC_Z writes UTC datetimes as "...Z", matching pydantic's output.
+    Routes with a response_model never get here: FastAPI validates their
+    return value and dumps it to JSON bytes in pydantic-core itself.
+    """
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = orjson.dumps(
+            content,
+            default=encode_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        )
+        record_serialization(time.perf_counter() - start)
+        return body
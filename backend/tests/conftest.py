@@ -0,0 +1,51 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# Settings are read at import time, so they must be in place before the app
+# is imported: a throwaway SQLite database, cheap hashing, strict N+1 checks
+_database_dir = tempfile.mkdtemp(prefix="timetracker-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_database_dir, 'test.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("N_PLUS_ONE_MODE", "strict")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One app (and database) for the whole run; each test gets its own user"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Authorization header of a freshly registered user"""
+    response = client.post("/auth/register", json={
+        "email": f"{uuid.uuid4().hex}@example.com",
+        "first_name": "Test",
+        "last_name": "User",
+        "password": "password",
+    })
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def project(client, auth_headers):
+    """A client and a project of the test user"""
+    client_response = client.post("/clients/", json={"name": "Acme"}, headers=auth_headers)
+    assert client_response.status_code == 201, client_response.text
+    response = client.post("/projects/", json={
+        "name": "Website",
+        "client_id": client_response.json()["id"],
+        "hourly_rate": "100",
+    }, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    return response.json()
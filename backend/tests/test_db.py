@@ -0,0 +1,64 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session
+
+from db import create_db_and_tables, engine, repair_inverted_entries
+from models import TimeEntry
+from rollups import check_rollups
+
+
+def current_user_id(client, headers) -> uuid.UUID:
+    return uuid.UUID(client.get("/auth/me", headers=headers).json()["id"])
+
+
+def test_inverted_entries_are_collapsed_before_indexing(client, auth_headers, project):
+    user_id = current_user_id(client, auth_headers)
+    start = datetime(2026, 4, 1, 9, tzinfo=timezone.utc)
+    with Session(engine) as session:
+        # As stored by a negative manual duration, before those were rejected
+        entry = TimeEntry(
+            user_id=user_id, project_id=uuid.UUID(project["id"]),
+            start_time=start, end_time=start - timedelta(hours=1), duration_seconds=-3600
+        )
+        session.add(entry)
+        session.commit()
+        entry_id = entry.id
+
+    repair_inverted_entries()
+
+    with Session(engine) as session:
+        entry = session.get(TimeEntry, entry_id)
+        assert entry.end_time == start
+        assert entry.duration_seconds == 0
+        assert check_rollups(session, user_id) == []
+
+
+def test_duplicate_running_timers_are_stopped_before_indexing(client, auth_headers, project):
+    user_id = current_user_id(client, auth_headers)
+    [running_index] = [index for index in TimeEntry.__table__.indexes if index.name == "uq_timeentry_user_running"]
+    start = datetime(2026, 4, 2, 9, tzinfo=timezone.utc)
+
+    # A database from before the index, where concurrent starts slipped through
+    running_index.drop(engine)
+    try:
+        with Session(engine) as session:
+            timers = [
+                TimeEntry(user_id=user_id, project_id=uuid.UUID(project["id"]), start_time=start + timedelta(minutes=m))
+                for m in (0, 30, 45)
+            ]
+            session.add_all(timers)
+            session.commit()
+            timer_ids = [timer.id for timer in timers]
+    finally:
+        create_db_and_tables()
+
+    with Session(engine) as session:
+        first, second, latest = (session.get(TimeEntry, timer_id) for timer_id in timer_ids)
+        assert (first.end_time, first.duration_seconds) == (start + timedelta(minutes=30), 1800)
+        assert (second.end_time, second.duration_seconds) == (start + timedelta(minutes=45), 900)
+        assert latest.end_time is None
+        assert check_rollups(session, user_id) == []
+
+    running = client.get("/time-entries/timer/running", headers=auth_headers).json()
+    assert running["id"] == str(timer_ids[2])
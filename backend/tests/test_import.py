@@ -0,0 +1,76 @@
+import json
+
+from routers.time_entries import IMPORT_CHUNK_SIZE
+
+
+def import_file(client, headers, filename: str, content: str):
+    return client.post("/time-entries/import", files={"file": (filename, content.encode())}, headers=headers)
+
+
+def test_import_reports_bad_rows_by_line(client, auth_headers, project):
+    content = "\n".join([
+        "project,start_time,end_time,duration_seconds",
+        "Website,2026-01-01T09:00:00Z,2026-01-01T10:00:00Z,",
+        "Nope,2026-01-01T11:00:00Z,,600",
+        "Website,2026-01-01T13:00:00Z,2026-01-01T12:00:00Z,",
+        "Website,not-a-time,,600",
+        "Website,2026-01-01T14:00:00Z,,",
+        ",2026-01-01T15:00:00Z,,600",
+    ])
+
+    response = import_file(client, auth_headers, "entries.csv", content)
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["imported"] == 1
+    assert result["failed"] == 5
+    assert [error["row"] for error in result["errors"]] == [3, 4, 5, 6, 7]
+    assert result["errors"][0]["error"] == "Project not found"
+
+
+def test_import_ndjson_parse_errors(client, auth_headers, project):
+    content = "\n".join([
+        json.dumps({"project_id": project["id"], "start_time": "2026-01-02T09:00:00Z", "duration_seconds": 60}),
+        "{not json",
+        "[1, 2]",
+    ])
+
+    result = import_file(client, auth_headers, "entries.ndjson", content).json()
+
+    assert result["imported"] == 1
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+
+
+def test_import_mixed_time_zones(client, auth_headers, project):
+    """Offset-less times are taken as UTC, not compared against aware ones"""
+    content = "\n".join([
+        "project,start_time,end_time",
+        "Website,2026-01-03T09:00:00,2026-01-03T10:30:00+01:00",
+        "Website,2026-01-03T11:00:00+00:00,2026-01-03T11:30:00",
+        "Website,2026-01-03T13:00:00,2026-01-03T13:30:00+02:00",
+    ])
+
+    result = import_file(client, auth_headers, "entries.csv", content).json()
+
+    assert result["imported"] == 2
+    assert [error["row"] for error in result["errors"]] == [4]
+    assert "End time must be after start time" in result["errors"][0]["error"]
+    entries = client.get("/time-entries/", headers=auth_headers).json()
+    assert sorted(entry["duration_seconds"] for entry in entries) == [1800, 1800]
+    assert sorted(entry["start_time"] for entry in entries) == ["2026-01-03T09:00:00Z", "2026-01-03T11:00:00Z"]
+
+
+def test_import_spanning_several_chunks(client, auth_headers, project):
+    rows = IMPORT_CHUNK_SIZE * 2 + 500
+    lines = [
+        json.dumps({"project": "website", "start_time": "2026-02-01T00:00:00Z", "duration_seconds": 60})
+        for _ in range(rows)
+    ]
+    lines.insert(IMPORT_CHUNK_SIZE + 10, json.dumps({"project": "website"}))
+
+    result = import_file(client, auth_headers, "entries.ndjson", "\n".join(lines)).json()
+
+    assert result["imported"] == rows
+    assert [error["row"] for error in result["errors"]] == [IMPORT_CHUNK_SIZE + 11]
+    budget = client.get(f"/projects/{project['id']}/budget", headers=auth_headers).json()
+    assert budget["hours_used"] == str(round(rows * 60 / 3600, 2))
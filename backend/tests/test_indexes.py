@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from db import engine, async_engine
+
+
+@contextmanager
+def executed_statements():
+    """Collects (sql, parameters) of every statement run on either engine"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", record)
+
+
+def endpoint_statement(statements, table: str, *fragments: str) -> tuple[str, tuple]:
+    """The one SELECT on `table` the endpoint ran that contains every fragment"""
+    matches = [
+        (sql, parameters) for sql, parameters in statements
+        if sql.lstrip().startswith("SELECT") and f"FROM {table}" in sql and all(f in sql for f in fragments)
+    ]
+    assert len(matches) == 1, [sql for sql, _ in statements]
+    return matches[0]
+
+
+def query_plan(sql: str, parameters) -> list[str]:
+    """SQLite's EXPLAIN QUERY PLAN steps for a statement an endpoint ran"""
+    with engine.connect() as connection:
+        return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+
+
+def test_time_entry_list_uses_user_start_index(client, auth_headers, project):
+    """The list's filter and order come straight from the partial composite index"""
+    with executed_statements() as statements:
+        response = client.get("/time-entries/", headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    plan = query_plan(*endpoint_statement(statements, "timeentry", "ORDER BY"))
+
+    assert any("timeentry USING INDEX ix_timeentry_user_start_active" in step for step in plan), plan
+    assert not any("TEMP B-TREE FOR ORDER BY" in step for step in plan), plan
+
+
+def test_running_timer_lookup_uses_unique_running_index(client, auth_headers, project):
+    with executed_statements() as statements:
+        response = client.get("/time-entries/timer/running", headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    plan = query_plan(*endpoint_statement(statements, "timeentry", "end_time IS NULL"))
+
+    assert any("timeentry USING INDEX uq_timeentry_user_running" in step for step in plan), plan
+
+
+def test_invoice_list_uses_user_issue_date_index(client, auth_headers):
+    with executed_statements() as statements:
+        response = client.get("/invoices/", headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    plan = query_plan(*endpoint_statement(statements, "invoice", "ORDER BY"))
+
+    assert any("invoice USING INDEX ix_invoice_user_issue_date_active" in step for step in plan), plan
+    assert not any("TEMP B-TREE FOR ORDER BY" in step for step in plan), plan
+
+
+def test_project_list_uses_user_created_at_index(client, auth_headers, project):
+    with executed_statements() as statements:
+        response = client.get("/projects/", headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    plan = query_plan(*endpoint_statement(statements, "project", "ORDER BY"))
+
+    assert any("project USING INDEX ix_project_user_created_at" in step for step in plan), plan
+    assert not any("TEMP B-TREE FOR ORDER BY" in step for step in plan), plan
@@ -0,0 +1,158 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from db import engine
+from models import Invoice
+from tests.test_time_entries import query_count
+
+
+def import_entries(client, headers, project, count: int, start: datetime) -> list[str]:
+    """`count` back-to-back 30-minute entries; returns every uninvoiced entry id"""
+    lines = [
+        json.dumps({
+            "project_id": project["id"],
+            "start_time": (start + timedelta(hours=n)).isoformat(),
+            "duration_seconds": 1800,
+        })
+        for n in range(count)
+    ]
+    response = client.post(
+        "/time-entries/import", files={"file": ("entries.ndjson", "\n".join(lines).encode())}, headers=headers
+    )
+    assert response.json()["imported"] == count, response.text
+
+    ids = []
+    params = {"is_invoiced": "false", "limit": 500}
+    while True:
+        response = client.get("/time-entries/", params=params, headers=headers)
+        ids.extend(entry["id"] for entry in response.json())
+        if "X-Next-Cursor" not in response.headers:
+            return ids
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+
+def generate(client, headers, project, entry_ids: list[str]):
+    return client.post("/invoices/generate", json={
+        "client_id": project["client_id"],
+        "time_entry_ids": entry_ids,
+        "issue_date": "2026-02-01",
+        "due_date": "2026-03-01",
+    }, headers=headers)
+
+
+def uninvoiced_count(client, headers) -> int:
+    return len(client.get("/time-entries/", params={"is_invoiced": "false", "limit": 500}, headers=headers).json())
+
+
+def other_user(client) -> tuple[dict, dict]:
+    """Headers and project of another freshly registered user"""
+    headers = {"Authorization": "Bearer " + client.post("/auth/register", json={
+        "email": f"{uuid.uuid4().hex}@example.com", "first_name": "Other", "last_name": "User", "password": "password",
+    }).json()["access_token"]}
+    other_client = client.post("/clients/", json={"name": "Other"}, headers=headers).json()
+    other_project = client.post(
+        "/projects/", json={"name": "Other", "client_id": other_client["id"]}, headers=headers
+    ).json()
+    return headers, other_project
+
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_generate_rejects_another_users_entry(client, auth_headers, project):
+    own = import_entries(client, auth_headers, project, 3, START)
+    other_headers, other_project = other_user(client)
+    [foreign] = import_entries(client, other_headers, other_project, 1, START)
+
+    response = generate(client, auth_headers, project, [own[0], foreign, own[1]])
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == f"Time entry {foreign} not found"
+    # Nothing was invoiced on either side
+    assert uninvoiced_count(client, auth_headers) == 3
+    assert uninvoiced_count(client, other_headers) == 1
+
+
+def test_generate_rejects_already_invoiced_entry(client, auth_headers, project):
+    ids = import_entries(client, auth_headers, project, 3, START)
+    first = generate(client, auth_headers, project, ids[:1])
+    assert first.status_code == 201, first.text
+
+    response = generate(client, auth_headers, project, ids)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Time entry {ids[0]} is already invoiced"
+    assert uninvoiced_count(client, auth_headers) == 2
+    assert len(client.get("/invoices/", headers=auth_headers).json()) == 1
+
+
+def test_generate_large_invoice_in_constant_queries(client, auth_headers, project):
+    # The first invoice also creates the user's invoice counter
+    generate(client, auth_headers, project, import_entries(client, auth_headers, project, 2, START))
+    ids = import_entries(client, auth_headers, project, 2, START + timedelta(days=1))
+    small = generate(client, auth_headers, project, ids)
+    assert small.status_code == 201, small.text
+
+    ids = import_entries(client, auth_headers, project, 1200, START + timedelta(days=2))
+    assert len(ids) == 1200
+    large = generate(client, auth_headers, project, ids)
+
+    assert large.status_code == 201, large.text
+    invoice = large.json()
+    assert len(invoice["line_items"]) == 1200
+    assert {item["time_entry_id"] for item in invoice["line_items"]} == set(ids)
+    # 1200 half hours at 100/h
+    assert Decimal(invoice["subtotal"]) == Decimal("60000.00")
+    assert uninvoiced_count(client, auth_headers) == 0
+    assert query_count(large) == query_count(small)
+
+
+# ============================================
+# NUMBERING
+# ============================================
+
+def test_numbers_restart_for_every_user(client, auth_headers, project):
+    ids = import_entries(client, auth_headers, project, 2, START)
+    other_headers, other_project = other_user(client)
+    [other_id] = import_entries(client, other_headers, other_project, 1, START)
+
+    numbers = [
+        generate(client, auth_headers, project, ids[:1]).json()["invoice_number"],
+        generate(client, other_headers, other_project, [other_id]).json()["invoice_number"],
+        generate(client, auth_headers, project, ids[1:]).json()["invoice_number"],
+    ]
+
+    assert numbers == ["INV-001", "INV-001", "INV-002"]
+
+
+def test_concurrent_generation_hands_out_each_number_once(client, auth_headers, project):
+    """Including the race between first invoices to create the counter"""
+    ids = import_entries(client, auth_headers, project, 8, START)
+
+    with ThreadPoolExecutor(max_workers=len(ids)) as pool:
+        responses = list(pool.map(lambda entry_id: generate(client, auth_headers, project, [entry_id]), ids))
+
+    assert [response.status_code for response in responses] == [201] * len(ids), [r.text for r in responses]
+    numbers = sorted(response.json()["invoice_number"] for response in responses)
+    assert numbers == [f"INV-{n:03d}" for n in range(1, len(ids) + 1)]
+
+
+def test_database_rejects_a_users_duplicate_number(client, auth_headers, project):
+    """uq_invoice_user_number holds even for writes that bypass the counter"""
+    invoice = generate(client, auth_headers, project, import_entries(client, auth_headers, project, 1, START)).json()
+
+    with Session(engine) as session:
+        original = session.get(Invoice, uuid.UUID(invoice["id"]))
+        session.add(Invoice(
+            user_id=original.user_id, client_id=original.client_id, invoice_number=original.invoice_number,
+            issue_date=original.issue_date, due_date=original.due_date
+        ))
+        with pytest.raises(IntegrityError, match="invoice_number"):
+            session.commit()
@@ -0,0 +1,67 @@
+import re
+
+from metrics import BUCKETS
+
+SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'(\w+)="([^"]*)"')
+
+
+def scrape(client) -> dict[tuple, float]:
+    """Samples of /metrics as {(name, (label, value) pairs...): value}"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    samples = {}
+    for line in response.text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        name, labels, value = match.groups()
+        samples[(name, *sorted(LABEL.findall(labels or "")))] = float(value)
+    return samples
+
+
+def sample(samples, name: str, **labels) -> float:
+    """Value of one series (0 if it has never been recorded)"""
+    return samples.get((name, *sorted(labels.items())), 0)
+
+
+def test_request_is_counted_under_its_route_template(client, auth_headers, project):
+    entry = client.post("/time-entries/manual", json={
+        "project_id": project["id"], "start_time": "2026-01-01T09:00:00Z", "duration_seconds": 600,
+    }, headers=auth_headers).json()
+    route = {"method": "GET", "route": "/time-entries/{entry_id}"}
+    before = scrape(client)
+
+    assert client.get(f"/time-entries/{entry['id']}", headers=auth_headers).status_code == 200
+    after = scrape(client)
+
+    assert sample(after, "http_requests_total", **route, status="200") == (
+        sample(before, "http_requests_total", **route, status="200") + 1
+    )
+    for histogram in ("http_request_duration_seconds", "http_request_db_seconds", "http_request_serialization_seconds"):
+        assert sample(after, f"{histogram}_count", **route) == sample(before, f"{histogram}_count", **route) + 1
+        # Cumulative buckets, the last one (+Inf) matching the count
+        buckets = [
+            after[(f"{histogram}_bucket", *sorted({**route, "le": str(bound)}.items()))]
+            for bound in (*BUCKETS, "+Inf")
+        ]
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == sample(after, f"{histogram}_count", **route)
+    assert sample(after, "http_request_db_seconds_sum", **route) > sample(before, "http_request_db_seconds_sum", **route)
+    # The scrape itself is the only request being served
+    assert sample(after, "http_requests_in_flight") == 1
+    # Raw paths never become label values
+    assert not any(entry["id"] in str(key) for key in after)
+
+
+def test_unmatched_paths_share_one_series(client):
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample(scrape(client), "http_requests_total", **labels)
+
+    client.get("/no-such-page")
+    client.get("/no-such-page/either")
+    after = scrape(client)
+
+    assert sample(after, "http_requests_total", **labels) == before + 2
+    assert not any("no-such-page" in str(key) for key in after)
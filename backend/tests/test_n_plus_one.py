@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from sqlalchemy import event, text
+
+import n_plus_one
+from db import engine
+from n_plus_one import NPlusOneError, RequestFingerprints
+from routers import time_entries
+
+
+@pytest.fixture
+def strict_detector(monkeypatch):
+    """Strict mode at threshold 2, listening on the sync engine"""
+    monkeypatch.setattr(n_plus_one, "N_PLUS_ONE_MODE", "strict")
+    monkeypatch.setattr(n_plus_one, "N_PLUS_ONE_THRESHOLD", 2)
+    if not event.contains(engine, "after_cursor_execute", n_plus_one._after_cursor_execute):
+        event.listen(engine, "after_cursor_execute", n_plus_one._after_cursor_execute)
+        yield
+        event.remove(engine, "after_cursor_execute", n_plus_one._after_cursor_execute)
+    else:
+        yield
+
+
+@pytest.fixture
+def request_scope():
+    """What NPlusOneMiddleware sets up around each request"""
+    token = n_plus_one._current_request.set(RequestFingerprints())
+    yield
+    n_plus_one._current_request.reset(token)
+
+
+def test_repeated_query_raises_in_strict_mode(strict_detector, request_scope):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT :value"), {"value": 1})
+        with pytest.raises(NPlusOneError, match=r"repeated 2x"):
+            connection.execute(text("SELECT :value"), {"value": 2})
+
+
+def test_queries_outside_a_request_are_not_counted(strict_detector):
+    with engine.connect() as connection:
+        for value in range(3):
+            connection.execute(text("SELECT :value"), {"value": value})
+
+
+def test_suppressed_statements_are_not_counted(strict_detector, request_scope):
+    with engine.connect() as connection:
+        with n_plus_one.suppress():
+            for value in range(3):
+                connection.execute(text("SELECT :value"), {"value": value})
+        connection.execute(text("SELECT :value"), {"value": 1})
+
+
+def test_chunked_import_is_not_an_n_plus_one(client, auth_headers, project, strict_detector, monkeypatch):
+    """One insert per chunk is by design, however many chunks the file has"""
+    monkeypatch.setattr(time_entries, "IMPORT_CHUNK_SIZE", 10)
+    content = "\n".join(
+        json.dumps({"project_id": project["id"], "start_time": f"2026-05-01T{n // 60:02d}:{n % 60:02d}:00Z", "duration_seconds": 30})
+        for n in range(100)
+    )
+
+    response = client.post("/time-entries/import", files={"file": ("entries.ndjson", content.encode())}, headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == 100
@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+
+def import_entries(client, headers, project, ranges) -> None:
+    """Insert entries through the import, which does not reject overlaps"""
+    content = "\n".join(
+        json.dumps({"project_id": project["id"], "start_time": start, "end_time": end})
+        for start, end in ranges
+    )
+    response = client.post("/time-entries/import", files={"file": ("entries.ndjson", content.encode())}, headers=headers)
+    assert response.json()["imported"] == len(ranges), response.text
+
+
+def test_create_rejects_overlap(client, auth_headers, project):
+    entry = {"project_id": project["id"], "start_time": "2026-03-01T09:00:00Z", "end_time": "2026-03-01T10:00:00Z"}
+    assert client.post("/time-entries/", json=entry, headers=auth_headers).status_code == 201
+
+    overlapping = {**entry, "start_time": "2026-03-01T09:30:00Z", "end_time": "2026-03-01T10:30:00Z"}
+    assert client.post("/time-entries/", json=overlapping, headers=auth_headers).status_code == 400
+
+    # Touching ranges don't overlap
+    adjacent = {**entry, "start_time": "2026-03-01T10:00:00Z", "end_time": "2026-03-01T11:00:00Z"}
+    assert client.post("/time-entries/", json=adjacent, headers=auth_headers).status_code == 201
+
+
+def test_overlaps_lists_each_pair_once(client, auth_headers, project):
+    import_entries(client, auth_headers, project, [
+        ("2026-03-02T09:00:00Z", "2026-03-02T11:00:00Z"),
+        ("2026-03-02T10:00:00Z", "2026-03-02T10:30:00Z"),
+        ("2026-03-02T10:15:00Z", "2026-03-02T12:00:00Z"),
+        ("2026-03-02T12:00:00Z", "2026-03-02T13:00:00Z"),
+    ])
+
+    overlaps = client.get("/time-entries/overlaps", headers=auth_headers).json()
+
+    assert sorted(
+        (pair["first"]["start_time"][11:16], pair["second"]["start_time"][11:16], pair["overlap_seconds"])
+        for pair in overlaps
+    ) == [("09:00", "10:00", 1800), ("09:00", "10:15", 2700), ("10:00", "10:15", 900)]
+
+
+def test_running_timer_overlaps_later_entries(client, auth_headers, project):
+    """An open-ended timer overlaps everything after its start, in both checks"""
+    timer = client.post("/time-entries/timer/start", json={"project_id": project["id"]}, headers=auth_headers).json()
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    entry = {
+        "project_id": project["id"],
+        "start_time": later.isoformat(),
+        "end_time": (later + timedelta(hours=1)).isoformat(),
+    }
+    assert client.post("/time-entries/", json=entry, headers=auth_headers).status_code == 400
+
+    import_entries(client, auth_headers, project, [(entry["start_time"], entry["end_time"])])
+
+    overlaps = client.get("/time-entries/overlaps", headers=auth_headers).json()
+    assert len(overlaps) == 1
+    assert overlaps[0]["first"]["id"] == timer["id"]
+    assert overlaps[0]["overlap_seconds"] == 0  # the timer hasn't reached it yet
+
+
+def test_manual_entry_rejects_negative_duration(client, auth_headers, project):
+    response = client.post("/time-entries/manual", json={
+        "project_id": project["id"],
+        "start_time": "2026-03-03T09:00:00Z",
+        "duration_seconds": -3600,
+    }, headers=auth_headers)
+    assert response.status_code == 422
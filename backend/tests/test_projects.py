@@ -0,0 +1,16 @@
+def test_project_list_etag_changes_with_logged_time(client, auth_headers, project):
+    """Budgets are part of the list, so new time must change the tag"""
+    etag = client.get("/projects/", headers=auth_headers).headers["ETag"]
+    assert client.get("/projects/", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    response = client.post("/time-entries/manual", json={
+        "project_id": project["id"],
+        "start_time": "2026-01-01T09:00:00Z",
+        "duration_seconds": 1800,
+    }, headers=auth_headers)
+    assert response.status_code == 201
+
+    response = client.get("/projects/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["budget"]["hours_used"] == "0.50"
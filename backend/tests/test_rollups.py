@@ -0,0 +1,67 @@
+import uuid
+
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, select
+
+from db import engine
+from models import DailyRollup, TimeEntry
+from rollups import check_rollups, rebuild_rollups, sql_day
+
+
+def rollup_rows(session: Session, user_id: uuid.UUID) -> dict:
+    statement = select(DailyRollup).where(DailyRollup.user_id == user_id)
+    rows = {
+        (row.project_id, row.day): (row.entry_count, row.total_seconds, row.billable_seconds, row.invoiced_seconds)
+        for row in session.exec(statement).all()
+    }
+    # Incremental writes leave emptied days as zero rows; a rebuild omits them
+    return {key: totals for key, totals in rows.items() if any(totals)}
+
+
+def test_incremental_rollups_match_a_rebuild(client, auth_headers, project):
+    """Every write path keeps daily_rollup equal to recomputing it from entries"""
+    headers = auth_headers
+    other = client.post("/projects/", json={"name": "Other", "hourly_rate": "50"}, headers=headers).json()
+
+    def manual(start: str, seconds: int, project_id: str = project["id"]) -> str:
+        response = client.post("/time-entries/manual", json={
+            "project_id": project_id, "start_time": start, "duration_seconds": seconds,
+        }, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    # Late evening with an offset: the UTC day is the next one
+    late = manual("2026-06-01T23:30:00-02:00", 1800)
+    ids = [manual(f"2026-06-0{day}T09:00:00Z", 3600 * day) for day in range(2, 6)]
+    assert client.patch(f"/time-entries/{late}", json={"is_billable": False}, headers=headers).status_code == 200
+    assert client.patch(f"/time-entries/{ids[0]}", json={
+        "start_time": "2026-06-07T09:00:00Z", "end_time": "2026-06-07T09:45:00Z",
+    }, headers=headers).status_code == 200
+    bulk = client.patch("/time-entries/bulk", json={"ids": ids[1:3], "project_id": other["id"]}, headers=headers)
+    assert bulk.json()["affected"] == 2
+    bulk = client.request("DELETE", "/time-entries/bulk", json={"ids": [ids[3]]}, headers=headers)
+    assert bulk.json()["affected"] == 1
+    assert client.delete(f"/time-entries/{ids[1]}", headers=headers).status_code == 204
+    invoice = client.post("/invoices/generate", json={
+        "client_id": project["client_id"], "time_entry_ids": [ids[0]],
+        "issue_date": "2026-06-30", "due_date": "2026-07-30",
+    }, headers=headers)
+    assert invoice.status_code == 201, invoice.text
+    imported = client.post("/time-entries/import", files={"file": ("entries.csv", (
+        "project,start_time,duration_seconds\nWebsite,2026-06-10T22:00:00-05:00,600\n"
+    ).encode())}, headers=headers)
+    assert imported.json()["imported"] == 1
+
+    user_id = uuid.UUID(client.get("/auth/me", headers=headers).json()["id"])
+    with Session(engine) as session:
+        assert check_rollups(session, user_id) == []
+        incremental = rollup_rows(session, user_id)
+        rebuild_rollups(session, user_id)
+        assert rollup_rows(session, user_id) == incremental
+
+
+def test_postgres_rollup_day_is_the_utc_date():
+    """Independent of the server's TimeZone setting, like entry_day()"""
+    expression = sql_day(TimeEntry.start_time, "postgresql")
+    sql = str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert sql == "CAST(timezone('UTC', timeentry.start_time) AS DATE)"
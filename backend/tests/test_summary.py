@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from api_types import TimeSummaryGroupBy
+from models import DailyRollup, TimeEntry
+from routers.time_entries import period_start
+
+
+@pytest.fixture
+def summary_entries(client, auth_headers, project):
+    other = client.post("/projects/", json={"name": "Other", "hourly_rate": "50"}, headers=auth_headers).json()
+    for project_id, start, seconds, billable in [
+        (project["id"], "2026-06-01T09:00:00Z", 3600, True),
+        # 01:30 UTC on Thursday 4 June, though Wednesday locally
+        (project["id"], "2026-06-03T23:30:00-02:00", 1800, True),
+        (other["id"], "2026-06-08T09:00:00Z", 7200, True),
+        (project["id"], "2026-07-01T10:00:00Z", 3600, False),
+    ]:
+        response = client.post("/time-entries/manual", json={
+            "project_id": project_id, "start_time": start, "duration_seconds": seconds, "is_billable": billable,
+        }, headers=auth_headers)
+        assert response.status_code == 201, response.text
+    return other
+
+
+EXPECTED = {
+    "day": [("2026-06-01", 3600), ("2026-06-04", 1800), ("2026-06-08", 7200), ("2026-07-01", 3600)],
+    "week": [("2026-06-01", 5400), ("2026-06-08", 7200), ("2026-06-29", 3600)],
+    "month": [("2026-06-01", 12600), ("2026-07-01", 3600)],
+    "project": [("Other", 7200), ("Website", 9000)],
+    "client": [("Acme", 9000), ("No client", 7200)],
+}
+
+
+@pytest.mark.parametrize("group_by", list(EXPECTED))
+# Without billable/invoiced filters the rollups are read, otherwise raw entries
+@pytest.mark.parametrize("filters", [{}, {"is_invoiced": "false"}])
+def test_summary_buckets(client, auth_headers, summary_entries, group_by, filters):
+    response = client.get("/time-entries/summary", params={"group_by": group_by, **filters}, headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert sorted((bucket["label"], bucket["total_seconds"]) for bucket in summary["buckets"]) == EXPECTED[group_by]
+    assert summary["totals"]["total_seconds"] == 16200
+    assert summary["totals"]["billable_seconds"] == 12600
+    assert summary["totals"]["billable_amount"] == "250.00"
+
+
+@pytest.mark.parametrize("column, expected", [
+    (TimeEntry.start_time, "CAST(date_trunc('week', timezone('UTC', timeentry.start_time)) AS DATE)"),
+    (DailyRollup.day, "CAST(date_trunc('week', CAST(daily_rollup.day AS TIMESTAMP WITHOUT TIME ZONE)) AS DATE)"),
+])
+def test_postgres_periods_truncate_in_utc(column, expected):
+    """Not in the server's TimeZone, which date_trunc on a timestamptz would use"""
+    expression = period_start(column, TimeSummaryGroupBy.WEEK, "postgresql")
+    assert str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})) == expected
@@ -0,0 +1,189 @@
+import json
+import re
+import uuid
+
+import pytest
+
+from routers import time_entries
+
+
+def query_count(response) -> int:
+    """Statements the request ran, from the profiler's Server-Timing header"""
+    match = re.search(r'desc="(\d+) queries"', response.headers["Server-Timing"])
+    assert match, response.headers["Server-Timing"]
+    return int(match.group(1))
+
+
+def create_entries(client, headers, project, slots: range) -> None:
+    """One 10-minute entry per 15-minute slot of 2026-01-01"""
+    for slot in slots:
+        response = client.post("/time-entries/manual", json={
+            "project_id": project["id"],
+            "start_time": f"2026-01-01T{slot // 4:02d}:{slot % 4 * 15:02d}:00Z",
+            "duration_seconds": 600,
+        }, headers=headers)
+        assert response.status_code == 201, response.text
+
+
+# ============================================
+# LIST
+# ============================================
+
+def test_list_query_count_does_not_grow_with_entries(client, auth_headers, project):
+    """Projects and clients come from the same query, not one lookup per entry"""
+    create_entries(client, auth_headers, project, range(0, 2))
+    few = client.get("/time-entries/", headers=auth_headers)
+    assert few.status_code == 200
+    assert len(few.json()) == 2
+
+    create_entries(client, auth_headers, project, range(2, 40))
+    many = client.get("/time-entries/", headers=auth_headers)
+    assert many.status_code == 200
+    assert len(many.json()) == 40
+    assert all(entry["project"]["client"]["name"] == "Acme" for entry in many.json())
+
+    assert query_count(many) == query_count(few)
+
+
+def import_entries(client, headers, project, start_times: list[str], **fields) -> None:
+    """30-minute entries at the given start times (the import allows ties)"""
+    content = "\n".join(
+        json.dumps({"project_id": project["id"], "start_time": start, "duration_seconds": 1800, **fields})
+        for start in start_times
+    )
+    response = client.post("/time-entries/import", files={"file": ("entries.ndjson", content.encode())}, headers=headers)
+    assert response.json()["imported"] == len(start_times), response.text
+
+
+def list_pages(client, headers, params: dict) -> list[list[dict]]:
+    """Every page of the list, following X-Next-Cursor"""
+    params = dict(params)
+    pages = []
+    while True:
+        response = client.get("/time-entries/", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        if "X-Next-Cursor" not in response.headers:
+            return pages
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+
+def test_cursor_pages_through_tied_start_times(client, auth_headers, project):
+    """Entries sharing a start time are neither repeated nor skipped across pages"""
+    import_entries(client, auth_headers, project, ["2026-01-01T09:00:00Z"] * 5 + ["2026-01-01T08:00:00Z"] * 4)
+    everything = client.get("/time-entries/", headers=auth_headers).json()
+
+    pages = list_pages(client, auth_headers, {"limit": 2})
+
+    assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+    assert [entry["id"] for page in pages for entry in page] == [entry["id"] for entry in everything]
+
+
+def test_cursor_keeps_filters(client, auth_headers, project):
+    other_project = client.post(
+        "/projects/", json={"name": "Other", "client_id": project["client_id"]}, headers=auth_headers
+    ).json()
+    starts = [f"2026-01-{day:02d}T09:00:00Z" for day in range(1, 8)]
+    import_entries(client, auth_headers, project, starts)
+    import_entries(client, auth_headers, project, starts, is_billable=False)
+    import_entries(client, auth_headers, other_project, starts)
+
+    filters = {"project_id": project["id"], "is_billable": "true", "start_date": "2026-01-02", "end_date": "2026-01-06"}
+    pages = list_pages(client, auth_headers, {**filters, "limit": 2})
+
+    entries = [entry for page in pages for entry in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert all(entry["project_id"] == project["id"] and entry["is_billable"] for entry in entries)
+    assert [entry["start_time"][:10] for entry in entries] == [f"2026-01-{day:02d}" for day in range(6, 1, -1)]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "bm90IGpzb24", "WyJ5ZXN0ZXJkYXkiLCAiMSJd"])
+def test_malformed_cursor_is_rejected(client, auth_headers, cursor):
+    """Garbage, base64 of non-JSON, and a bad date/id pair"""
+    response = client.get("/time-entries/", params={"cursor": cursor}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+# ============================================
+# TIMER (async routes)
+# ============================================
+
+def test_timer_start_running_stop(client, auth_headers, project):
+    started = client.post("/time-entries/timer/start", json={"project_id": project["id"]}, headers=auth_headers)
+    assert started.status_code == 201, started.text
+    assert started.json()["end_time"] is None
+
+    running = client.get("/time-entries/timer/running", headers=auth_headers)
+    assert running.status_code == 200
+    assert running.json()["id"] == started.json()["id"]
+
+    stopped = client.patch("/time-entries/timer/stop", headers=auth_headers)
+    assert stopped.status_code == 200, stopped.text
+    assert stopped.json()["id"] == started.json()["id"]
+    assert stopped.json()["end_time"] is not None
+    assert stopped.json()["duration_seconds"] >= 0
+
+    assert client.get("/time-entries/timer/running", headers=auth_headers).json() is None
+    assert client.patch("/time-entries/timer/stop", headers=auth_headers).status_code == 404
+
+
+def test_timer_start_while_running_is_rejected(client, auth_headers, project):
+    """The unique running-timer index turns the second start into a 400"""
+    first = client.post("/time-entries/timer/start", json={"project_id": project["id"]}, headers=auth_headers)
+    assert first.status_code == 201
+
+    second = client.post("/time-entries/timer/start", json={"project_id": project["id"]}, headers=auth_headers)
+    assert second.status_code == 400
+    assert second.json()["detail"] == f"Timer already running for project {project['id']}"
+
+    # The failed start left the running timer alone
+    running = client.get("/time-entries/timer/running", headers=auth_headers)
+    assert running.json()["id"] == first.json()["id"]
+
+
+def test_timer_start_for_unknown_project(client, auth_headers):
+    response = client.post("/time-entries/timer/start", json={"project_id": str(uuid.uuid4())}, headers=auth_headers)
+    assert response.status_code == 404
+
+
+# ============================================
+# BULK UPDATE
+# ============================================
+
+@pytest.mark.parametrize("field", ["project_id", "is_billable"])
+def test_bulk_update_rejects_null_for_required_fields(client, auth_headers, project, field):
+    create_entries(client, auth_headers, project, range(1))
+
+    response = client.patch("/time-entries/bulk", json={"filters": {}, field: None}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_bulk_update_clears_description(client, auth_headers, project):
+    create_entries(client, auth_headers, project, range(1))
+
+    response = client.patch("/time-entries/bulk", json={"filters": {}, "description": None}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["affected"] == 1
+
+
+def test_bulk_changes_to_running_timer_are_published(client, auth_headers, project, monkeypatch):
+    published = []
+
+    def record(user_id, event_type, data):
+        published.append((event_type, data))
+
+    monkeypatch.setattr(time_entries, "publish_timer_event", record)
+    timer = client.post("/time-entries/timer/start", json={"project_id": project["id"]}, headers=auth_headers).json()
+
+    response = client.patch("/time-entries/bulk", json={"ids": [timer["id"]], "description": "Renamed"}, headers=auth_headers)
+    assert response.json()["affected"] == 1
+    assert published[-1][0] == "timer.updated"
+    assert published[-1][1]["description"] == "Renamed"
+
+    response = client.request("DELETE", "/time-entries/bulk", json={"filters": {}}, headers=auth_headers)
+    assert response.json()["affected"] == 1
+    assert published[-1] == ("timer.stopped", {
+        "id": timer["id"], "project_id": project["id"], "end_time": None, "duration_seconds": None,
+    })
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from starlette.requests import Request
+
+import auth
+
+
+@pytest.fixture(autouse=True)
+def client_leaves_after_first_event(monkeypatch):
+    """End streams after the initial state (TestClient never reports a disconnect)"""
+    async def is_disconnected(self):
+        return True
+
+    monkeypatch.setattr(Request, "is_disconnected", is_disconnected)
+
+
+def stream_token(client, headers) -> str:
+    response = client.post("/time-entries/timer/stream-token", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["expires_in"] > 0
+    return response.json()["token"]
+
+
+def first_event(client, token: str) -> tuple[str, object]:
+    with client.stream("GET", "/time-entries/timer/stream", params={"token": token}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        lines = response.iter_lines()
+        event = next(lines)
+        data = next(lines)
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_stream_opens_with_a_stream_token(client, auth_headers, project):
+    assert first_event(client, stream_token(client, auth_headers)) == ("timer.state", None)
+
+    timer = client.post("/time-entries/timer/start", json={"project_id": project["id"]}, headers=auth_headers).json()
+    event, data = first_event(client, stream_token(client, auth_headers))
+    assert event == "timer.state"
+    assert data["id"] == timer["id"]
+
+
+def test_stream_rejects_access_tokens_in_the_url(client, auth_headers):
+    access_token = auth_headers["Authorization"].removeprefix("Bearer ")
+
+    response = client.get("/time-entries/timer/stream", params={"token": access_token})
+    assert response.status_code == 401
+    assert client.get("/time-entries/timer/stream").status_code == 422
+
+
+def test_stream_token_is_not_an_access_token(client, auth_headers):
+    token = stream_token(client, auth_headers)
+
+    response = client.get("/time-entries/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_stream_rejects_expired_stream_tokens(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(auth, "STREAM_TOKEN_EXPIRE_SECONDS", -1)
+    token = client.post("/time-entries/timer/stream-token", headers=auth_headers).json()["token"]
+
+    assert client.get("/time-entries/timer/stream", params={"token": token}).status_code == 401
@@ -3,8 +3,12 @@ import {
   TimeEntryWithProject,
   TimerResponse,
   TimerStartRequest,
+  TimerStreamToken,
 } from "@/lib/types";
 
+// Wait before reopening a dropped timer stream
+const TIMER_STREAM_RETRY_MS = 5000;
+
 export const timeApi = {
   // Get all entries (we will filter client-side for the dashboard stats for now)
   getAll: async () => {
@@ -13,19 +17,6 @@ export const timeApi = {
   },
 
   // Timer specific endpoints
-  getRunning: async () => {
-    // Returns 204 or null if no timer, so handle that
-    try {
-      const { data } = await api.get<TimerResponse>(
-        "/time-entries/timer/running"
-      );
-      return data;
-    } catch (error) {
-      console.error(error);
-      return null;
-    }
-  },
-
   startTimer: async (payload: TimerStartRequest) => {
     const { data } = await api.post<TimerResponse>(
       "/time-entries/timer/start",
@@ -38,4 +29,60 @@ export const timeApi = {
     const { data } = await api.patch<TimerResponse>("/time-entries/timer/stop");
     return data;
   },
+
+  // Running timer pushed over Server-Sent Events (from any tab or device)
+  // instead of polling. Calls onChange with the current timer first, then on
+  // every start/update/stop. Returns a function that closes the stream.
+  subscribeTimer: (onChange: (timer: TimerResponse | null) => void) => {
+    let source: EventSource | null = null;
+    let retry: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
+    const reconnect = () => {
+      if (!closed) {
+        retry = setTimeout(connect, TIMER_STREAM_RETRY_MS);
+      }
+    };
+
+    const connect = async () => {
+      // EventSource can't send the Authorization header: every connection
+      // opens with a fresh short-lived stream token in the URL instead
+      let token: string;
+      try {
+        const { data } = await api.post<TimerStreamToken>(
+          "/time-entries/timer/stream-token"
+        );
+        token = data.token;
+      } catch (error) {
+        console.error(error);
+        return reconnect();
+      }
+      if (closed) return;
+
+      source = new EventSource(
+        `${api.defaults.baseURL}/time-entries/timer/stream?token=${encodeURIComponent(token)}`
+      );
+
+      const setTimer = (event: MessageEvent<string>) =>
+        onChange(JSON.parse(event.data));
+      source.addEventListener("timer.state", setTimer);
+      source.addEventListener("timer.started", setTimer);
+      source.addEventListener("timer.updated", setTimer);
+      source.addEventListener("timer.stopped", () => onChange(null));
+
+      // The browser's own retry would reuse the (by then expired) token
+      source.onerror = () => {
+        source?.close();
+        reconnect();
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      if (retry) clearTimeout(retry);
+      source?.close();
+    };
+  },
 };
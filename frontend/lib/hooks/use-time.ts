@@ -1,3 +1,4 @@
+import { useEffect, useState } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { timeApi } from "@/lib/api/time";
 import { toast } from "sonner";
@@ -17,13 +18,20 @@ export function useTimeEntries() {
 
 export function useTimer() {
   const queryClient = useQueryClient();
-  const { setRunningTimer } = useTimerStore();
+  const { runningTimer, setRunningTimer } = useTimerStore();
+  const [isLoading, setIsLoading] = useState(true);
 
-  // 1. Check for running timer on mount
-  const { data: runningTimer, isLoading } = useQuery({
-    queryKey: ["timer-running"],
-    queryFn: timeApi.getRunning,
-  });
+  // 1. Follow the running timer over the timer stream (no polling)
+  useEffect(() => {
+    return timeApi.subscribeTimer((timer) => {
+      // A timer stopped elsewhere has become a time entry
+      if (!timer && useTimerStore.getState().runningTimer) {
+        queryClient.invalidateQueries({ queryKey: ["time-entries"] });
+      }
+      setRunningTimer(timer);
+      setIsLoading(false);
+    });
+  }, [queryClient, setRunningTimer]);
 
   // Start Timer Mutation
   const startMutation = useMutation({
@@ -159,6 +159,11 @@ export interface TimerResponse {
   elapsed_seconds: number;
 }
 
+export interface TimerStreamToken {
+  token: string;
+  expires_in: number;
+}
+
 // ==========================================
 // INVOICES
 // ==========================================